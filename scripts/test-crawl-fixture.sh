@@ -0,0 +1,54 @@
+#!/usr/bin/env bash
+# Crawls the local fixture catalog in scripts/crawl-fixture and checks that an
+# interrupted crawl resumes from its checkpoint. The catalog has two scripts
+# and one film page whose script link is broken (404).
+#
+#   bash scripts/test-crawl-fixture.sh
+#
+# Everything is written under a temporary HOME, so ~/.scriptsage is untouched.
+set -euo pipefail
+
+root=$(cd "$(dirname "$0")/.." && pwd)
+port=${PORT:-8765}
+work=$(mktemp -d)
+checkpoint="$work/crawl.sqlite"
+
+python3 -m http.server "$port" --bind 127.0.0.1 --directory "$root/scripts/crawl-fixture" >/dev/null 2>&1 &
+server=$!
+trap 'kill $server; rm -rf "$work"' EXIT
+sleep 1
+
+crawl() {
+    (cd "$root/scriptsage" && HOME="$work" python3 scriptsage_cli.py crawl "http://127.0.0.1:$port/all-scripts.html" \
+        --checkpoint "$checkpoint" --delay 0 "$@")
+}
+
+count() {
+    python3 -c "import sqlite3, sys; print(sqlite3.connect(sys.argv[1]).execute(\"SELECT COUNT(*) FROM urls WHERE kind = 'script' AND status = ?\", (sys.argv[2],)).fetchone()[0])" "$checkpoint" "$1"
+}
+
+check() {
+    if [ "$1" != "$2" ]; then
+        echo "FAIL: $3 (expected $2, got $1)"
+        exit 1
+    fi
+}
+
+# Stop after the first script, as an interrupted crawl would
+first=$(crawl --limit 1)
+check "$(echo "$first" | grep -c '^Processed 1 scripts$')" 1 "first run processes one script"
+check "$(count done)" 1 "one script done after the first run"
+
+# The second run resumes: only the remaining script is processed, and the
+# broken link is retried up to three times before it is marked failed
+second=$(crawl)
+check "$(echo "$second" | grep -c '^Processed 1 scripts$')" 1 "second run processes only the remaining script"
+check "$(count done)" 2 "both scripts done"
+check "$(count failed)" 1 "broken script link marked failed"
+check "$(ls "$work/.scriptsage/screenplays" | grep -c '\.json$')" 2 "two screenplays saved"
+
+# A third run finds nothing left to do
+third=$(crawl)
+check "$(echo "$third" | grep -c '^Processed 0 scripts$')" 1 "third run has nothing to process"
+
+echo "OK"
@@ -0,0 +1,263 @@
+import os
+import json
+import math
+import heapq
+import hashlib
+import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+
+class CountMinSketch:
+    # Estimates never undercount; with probability 1 - delta they overcount
+    # by at most epsilon * total, where epsilon = e / width, delta = e^-depth
+
+    def __init__(self, width=2 ** 14, depth=4):
+        if width < 1 or depth < 1:
+            raise ValueError("Count-Min sketch width and depth must be at least 1")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self._rows = np.arange(depth)
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+    def _columns(self, item):
+        # Double hashing: row i uses h1 + i * h2
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        self.table[self._rows, self._columns(item)] += count
+        self.total += count
+
+    def estimate(self, item):
+        return int(self.table[self._rows, self._columns(item)].min())
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-Min sketches must have the same width and depth to merge")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+
+class SpaceSaving:
+    # Keeps at most `capacity` counters. A reported count c with error e
+    # means the true count lies in [c - e, c]; any item missing from the
+    # summary occurred at most min_count times.
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("Space-Saving capacity must be at least 1")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self._heap = []
+
+    def min_count(self):
+        if len(self.counts) < self.capacity:
+            return 0
+        return self._peek_min()[0]
+
+    def _peek_min(self):
+        # The heap holds stale (count, item) entries; skip them lazily
+        while True:
+            count, item = self._heap[0]
+            if self.counts.get(item) == count:
+                return count, item
+            heapq.heappop(self._heap)
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, item) for item, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def add(self, item, count=1):
+        # Returns the item evicted to make room, if any
+        self.total += count
+        evicted = None
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            min_count, evicted = self._peek_min()
+            heapq.heappop(self._heap)
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = min_count + count
+            self.errors[item] = min_count
+        self._push(item)
+        return evicted
+
+    def merge(self, other):
+        # Items missing from one summary may have occurred up to that
+        # summary's min_count times, which is added as count and error
+        own_min = self.min_count()
+        other_min = other.min_count()
+        counts = {}
+        errors = {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, own_min) + other.counts.get(item, other_min)
+            errors[item] = (
+                (self.errors[item] if item in self.counts else own_min)
+                + (other.errors[item] if item in other.counts else other_min)
+            )
+        kept = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {item: counts[item] for item in kept}
+        self.errors = {item: errors[item] for item in kept}
+        self.total += other.total
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def top(self, count=10):
+        items = heapq.nlargest(count, self.counts, key=self.counts.get)
+        return [(item, self.counts[item], self.errors[item]) for item in items]
+
+
+class CorpusSketch:
+    # Memory is fixed by the parameters, not the corpus: capacity words,
+    # a width x depth table, and at most max_characters per-character
+    # summaries of character_capacity words each. Characters are kept by
+    # dialogue volume (words spoken) in their own Space-Saving summary, and
+    # a character's word summary is dropped when it is evicted from it.
+
+    def __init__(self, capacity=1000, character_capacity=20, max_characters=500, width=2 ** 14, depth=4):
+        # Per-character summaries are created lazily, so check their size now
+        if character_capacity < 1:
+            raise ValueError("Space-Saving capacity must be at least 1")
+        self.capacity = capacity
+        self.character_capacity = character_capacity
+        self.max_characters = max_characters
+        self.screenplays = 0
+        self.top_words = SpaceSaving(capacity)
+        self.word_counts = CountMinSketch(width, depth)
+        self.characters = SpaceSaving(max_characters)
+        self.character_words = {}
+
+    def add_screenplay(self, data, stop_words=frozenset()):
+        screenplay = data["screenplay"]
+        character_names = {char["name"].lower() for char in screenplay["characters"]}
+
+        def keep(word):
+            return word not in stop_words and word not in character_names and word.isalnum()
+
+        # Counting per screenplay first turns repeated words into one
+        # weighted update per distinct word
+        text = screenplay.get("script_content") or "\n".join(screenplay.get("global_dialogues", []))
+        for word, count in Counter(word for word in text.lower().split() if keep(word)).items():
+            self.top_words.add(word, count)
+            self.word_counts.add(word, count)
+
+        # Same character attribution as get_metrics; words are counted for
+        # this screenplay only, then folded into the bounded summaries
+        volumes = Counter()
+        words = {}
+        for char, dialogue in zip(screenplay.get("global_characters", []), screenplay.get("global_dialogues", [])):
+            key = f"{screenplay['title']} / {char}"
+            dialogue_words = dialogue.lower().split()
+            volumes[key] += len(dialogue_words)
+            words.setdefault(key, Counter()).update(word for word in dialogue_words if keep(word))
+
+        for key, volume in volumes.items():
+            evicted = self.characters.add(key, volume)
+            if evicted is not None:
+                del self.character_words[evicted]
+            summary = self.character_words.get(key)
+            if summary is None:
+                summary = self.character_words[key] = SpaceSaving(self.character_capacity)
+            for word, count in words[key].items():
+                summary.add(word, count)
+
+        self.screenplays += 1
+
+    def merge(self, other):
+        self.screenplays += other.screenplays
+        self.top_words.merge(other.top_words)
+        self.word_counts.merge(other.word_counts)
+        self.characters.merge(other.characters)
+        # Only characters that survive the merge keep a word summary
+        character_words = {}
+        for key in self.characters.counts:
+            summary = self.character_words.get(key)
+            other_summary = other.character_words.get(key)
+            if summary is None:
+                summary = other_summary
+            elif other_summary is not None:
+                summary.merge(other_summary)
+            character_words[key] = summary
+        self.character_words = character_words
+        return self
+
+    def estimate(self, word):
+        return self.word_counts.estimate(word)
+
+    def summary(self, top=50, character_top=5):
+        # The Count-Min estimate also bounds each Space-Saving count from above
+        top_words = []
+        for word, count, error in self.top_words.top(top):
+            upper = min(count, self.word_counts.estimate(word))
+            top_words.append({"word": word, "count": upper, "lower_bound": max(0, count - error)})
+
+        return {
+            "screenplays": self.screenplays,
+            "total_words": self.word_counts.total,
+            "top_words": top_words,
+            "error_bounds": {
+                "space_saving_max_overcount": self.top_words.total // self.capacity,
+                "count_min_epsilon": self.word_counts.epsilon,
+                "count_min_delta": self.word_counts.delta,
+                "count_min_max_overcount": math.ceil(self.word_counts.epsilon * self.word_counts.total),
+            },
+            # Characters with the most dialogue first
+            "characters": {
+                key: [
+                    {"word": word, "count": count, "lower_bound": max(0, count - error)}
+                    for word, count, error in self.character_words[key].top(character_top)
+                ]
+                for key, _, _ in self.characters.top(self.max_characters)
+            },
+        }
+
+
+def _sketch_paths(paths, stop_words, options):
+    sketch = CorpusSketch(**options)
+    for path in paths:
+        with open(path, "r") as f:
+            sketch.add_screenplay(json.load(f), stop_words)
+    return sketch
+
+
+def sketch_corpus(paths, stop_words=frozenset(), workers=None, **options):
+    # Each worker sketches its share of the corpus in fixed memory and the
+    # partial sketches are merged at the end
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        return _sketch_paths(paths, stop_words, options)
+
+    chunks = max(1, min(len(paths), workers or os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=chunks) as executor:
+        partials = executor.map(
+            _sketch_paths,
+            [paths[i::chunks] for i in range(chunks)],
+            [stop_words] * chunks,
+            [options] * chunks,
+        )
+        sketch = CorpusSketch(**options)
+        for partial in partials:
+            sketch.merge(partial)
+    return sketch
@@ -0,0 +1,154 @@
+import re
+import time
+import sqlite3
+import requests
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin, urlsplit, urldefrag, quote, unquote
+
+# Defaults match the IMSDb catalog: index pages link to per-film pages under
+# "Movie Scripts/", which in turn link to the script itself under "scripts/".
+DEFAULT_SEEDS = ["https://imsdb.com/all-scripts.html"]
+DEFAULT_FOLLOW_PATTERN = r"/(all-scripts\.html|alphabetical/|genre/|Movie Scripts/)"
+DEFAULT_SCRIPT_PATTERN = r"/scripts/[^/]+\.html$"
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def normalize_url(base, href):
+    url, _ = urldefrag(urljoin(base, href.strip()))
+    # Same quoting as scripts/converturl.sh, keeping existing escapes intact
+    return quote(url, safe=":/%?=&")
+
+
+def fetch_page(url):
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return response.text
+
+
+class CatalogCrawler:
+    # The frontier and done-set live in SQLite and every state change is
+    # committed immediately, so a crashed crawl resumes where it stopped.
+
+    def __init__(
+        self,
+        checkpoint_path,
+        seeds=DEFAULT_SEEDS,
+        follow_pattern=DEFAULT_FOLLOW_PATTERN,
+        script_pattern=DEFAULT_SCRIPT_PATTERN,
+        fetch=fetch_page,
+        delay=0.0,
+        max_attempts=3,
+    ):
+        self.follow_pattern = re.compile(follow_pattern)
+        self.script_pattern = re.compile(script_pattern)
+        self.fetch = fetch
+        self.delay = delay
+        self.max_attempts = max_attempts
+        self.hosts = {urlsplit(seed).netloc for seed in seeds}
+
+        self.connection = sqlite3.connect(checkpoint_path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            )
+            """
+        )
+        self.connection.commit()
+        for seed in seeds:
+            self.add(normalize_url(seed, ""), "index")
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, url, kind):
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO urls (url, kind, status) VALUES (?, ?, ?)",
+                (url, kind, PENDING),
+            )
+        return cursor.rowcount > 0
+
+    def _mark(self, url, status, error=None):
+        with self.connection:
+            self.connection.execute(
+                "UPDATE urls SET status = ?, error = ? WHERE url = ?", (status, error, url)
+            )
+
+    def _fail(self, url, error):
+        with self.connection:
+            self.connection.execute(
+                "UPDATE urls SET attempts = attempts + 1, error = ? WHERE url = ?", (error, url)
+            )
+            self.connection.execute(
+                "UPDATE urls SET status = ? WHERE url = ? AND attempts >= ?",
+                (FAILED, url, self.max_attempts),
+            )
+
+    def _next(self):
+        # Scripts first so the pipeline is fed as soon as items are found;
+        # previously failed items go to the back of the queue
+        return self.connection.execute(
+            """
+            SELECT url, kind FROM urls WHERE status = ?
+            ORDER BY attempts, kind = 'index', rowid LIMIT 1
+            """,
+            (PENDING,),
+        ).fetchone()
+
+    def classify(self, url):
+        path = unquote(urlsplit(url).path)
+        if urlsplit(url).netloc not in self.hosts:
+            return None
+        if self.script_pattern.search(path):
+            return "script"
+        if self.follow_pattern.search(path):
+            return "index"
+        return None
+
+    def discover(self, url, html):
+        soup = BeautifulSoup(html, "html.parser")
+        found = 0
+        for link in soup.find_all("a", href=True):
+            target = normalize_url(url, link["href"])
+            kind = self.classify(target)
+            if kind and self.add(target, kind):
+                found += 1
+        return found
+
+    def crawl(self, handle_script, limit=None):
+        # handle_script(url) runs for each discovered script; an item is only
+        # marked done after its handler returns
+        handled = 0
+        while limit is None or handled < limit:
+            item = self._next()
+            if item is None:
+                break
+            url, kind = item
+            try:
+                if kind == "index":
+                    self.discover(url, self.fetch(url))
+                else:
+                    handle_script(url)
+                    handled += 1
+            except Exception as e:
+                self._fail(url, str(e))
+                print(f"Failed to process {url}: {str(e)}")
+            else:
+                self._mark(url, DONE)
+            if self.delay:
+                time.sleep(self.delay)
+        return handled
+
+    def stats(self):
+        rows = self.connection.execute(
+            "SELECT kind, status, COUNT(*) FROM urls GROUP BY kind, status"
+        ).fetchall()
+        return {f"{kind} {status}": count for kind, status, count in rows}
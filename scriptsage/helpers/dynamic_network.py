@@ -0,0 +1,167 @@
+import math
+import matplotlib.pyplot as plt
+import networkx as nx
+from collections import deque
+
+
+class SlidingWindowNetwork:
+    # Co-occurrence graph over the scenes currently in the window. Adding or
+    # expiring a scene only touches the pairs of characters in that scene.
+
+    def __init__(self):
+        self.scenes = deque()
+        self.edge_weights = {}
+        self.node_scenes = {}
+        self.degrees = {}
+        self.strengths = {}
+
+    @staticmethod
+    def _pairs(characters):
+        characters = sorted(characters)
+        for i in range(len(characters)):
+            for j in range(i + 1, len(characters)):
+                yield characters[i], characters[j]
+
+    def add_scene(self, characters):
+        characters = set(characters)
+        self.scenes.append(characters)
+        for name in characters:
+            self.node_scenes[name] = self.node_scenes.get(name, 0) + 1
+        for edge in self._pairs(characters):
+            weight = self.edge_weights.get(edge, 0)
+            if weight == 0:
+                for name in edge:
+                    self.degrees[name] = self.degrees.get(name, 0) + 1
+            self.edge_weights[edge] = weight + 1
+            for name in edge:
+                self.strengths[name] = self.strengths.get(name, 0) + 1
+
+    def expire_scene(self):
+        characters = self.scenes.popleft()
+        for edge in self._pairs(characters):
+            weight = self.edge_weights[edge] - 1
+            if weight == 0:
+                del self.edge_weights[edge]
+                for name in edge:
+                    self.degrees[name] -= 1
+                    if self.degrees[name] == 0:
+                        del self.degrees[name]
+            else:
+                self.edge_weights[edge] = weight
+            for name in edge:
+                self.strengths[name] -= 1
+                if self.strengths[name] == 0:
+                    del self.strengths[name]
+        for name in characters:
+            self.node_scenes[name] -= 1
+            if self.node_scenes[name] == 0:
+                del self.node_scenes[name]
+
+    def density(self):
+        nodes = len(self.node_scenes)
+        if nodes < 2:
+            return 0.0
+        return 2 * len(self.edge_weights) / (nodes * (nodes - 1))
+
+    def central_characters(self, count=3):
+        # Weighted degree, ties broken by name for stable output
+        return sorted(self.strengths, key=lambda name: (-self.strengths[name], name))[:count]
+
+
+def iter_windows(scene_characters, window=10, step=1):
+    # Takes each scene's list of characters and yields (start, end, network)
+    # with 1-based inclusive scene bounds; the network is updated in place,
+    # so copy anything kept past one iteration
+    network = SlidingWindowNetwork()
+    window = max(1, min(window, len(scene_characters)))
+    step = max(1, step)
+
+    for characters in scene_characters[:window]:
+        network.add_scene(characters)
+    start = 0
+    while True:
+        yield start + 1, start + window, network
+        end = start + window
+        if end == len(scene_characters):
+            break
+        # The last step is shortened so the final window ends on the last scene
+        advance = min(step, len(scene_characters) - end)
+        for characters in scene_characters[end:end + advance]:
+            network.add_scene(characters)
+        for _ in range(advance):
+            network.expire_scene()
+        start += advance
+
+
+def window_metrics(data, window=10, step=1, top=3):
+    return scene_window_metrics(
+        [scene["characters"] for scene in data["screenplay"]["scenes"]], window=window, step=step, top=top
+    )
+
+
+def scene_window_metrics(scene_characters, window=10, step=1, top=3):
+    if not scene_characters:
+        return []
+    return [
+        {
+            "start": start,
+            "end": end,
+            "nodes": len(network.node_scenes),
+            "edges": len(network.edge_weights),
+            "density": network.density(),
+            "central_characters": network.central_characters(top),
+        }
+        for start, end, network in iter_windows(scene_characters, window, step)
+    ]
+
+
+def plot_dynamic_network(data, output_path, window=10, panels=9):
+    scenes = data["screenplay"]["scenes"]
+    if not scenes:
+        print("No scenes found. Skipping dynamic network.")
+        return
+
+    windows = max(1, len(scenes) - min(window, len(scenes)) + 1)
+    panels = min(panels, windows)
+    wanted = {round(i * (windows - 1) / max(1, panels - 1)) + 1 for i in range(panels)}
+
+    snapshots = []
+    for start, end, network in iter_windows([scene["characters"] for scene in scenes], window):
+        if start in wanted:
+            snapshots.append((start, end, dict(network.node_scenes), dict(network.edge_weights), network.density()))
+
+    # One layout for the whole film keeps characters in place across panels
+    full_graph = nx.Graph()
+    for _, _, nodes, edges, _ in snapshots:
+        full_graph.add_nodes_from(nodes)
+        full_graph.add_edges_from(edges)
+    pos = nx.spring_layout(full_graph, seed=1)
+
+    columns = math.ceil(math.sqrt(len(snapshots)))
+    rows = math.ceil(len(snapshots) / columns)
+    fig, axes = plt.subplots(rows, columns, figsize=(5 * columns, 5 * rows), squeeze=False)
+    for ax in axes.flat:
+        ax.axis("off")
+
+    for ax, (start, end, nodes, edges, density) in zip(axes.flat, snapshots):
+        G = nx.Graph()
+        G.add_nodes_from(nodes)
+        for (char1, char2), weight in edges.items():
+            G.add_edge(char1, char2, weight=weight)
+        nx.draw(
+            G,
+            pos,
+            ax=ax,
+            with_labels=True,
+            node_size=[nodes[node] * 60 for node in G.nodes()],
+            width=[G[u][v]["weight"] for u, v in G.edges()],
+            node_color="skyblue",
+            edge_color="gray",
+            font_size=7,
+        )
+        ax.set_title(f"Scenes {start}-{end} (density {density:.2f})")
+
+    fig.suptitle("Character Interaction Over Time")
+    fig.tight_layout(rect=(0, 0, 1, 0.96))
+    fig.savefig(output_path)
+    plt.close(fig)
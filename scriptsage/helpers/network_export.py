@@ -0,0 +1,121 @@
+import json
+import networkx as nx
+from jinja2 import Template
+from helpers.network_metrics import build_interaction_graph, compute_network_metrics, top_central_characters
+
+VIS_NETWORK_URL = "https://unpkg.com/vis-network@9.1.9/standalone/umd/vis-network.min.js"
+
+# Positions are computed once in Python and client-side physics is off, so
+# opening the page only draws; nodes and edges ship as flat JSON arrays.
+page_template = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{{ title | e }}</title>
+<script src="{{ vis_url }}"></script>
+<style>
+body { margin: 0; font-family: sans-serif; }
+#controls { padding: 8px; }
+#network { width: {{ width }}px; height: {{ height }}px; border: 1px solid #ddd; }
+</style>
+</head>
+<body>
+<div id="controls">
+<label>Minimum interaction weight: <input id="min-weight" type="range" min="{{ min_weight }}" max="{{ max_weight }}" value="{{ initial_weight }}"></label>
+<span id="min-weight-value">{{ initial_weight }}</span>
+</div>
+<div id="network"></div>
+<script>
+var data = {{ payload }};
+var nodes = new vis.DataSet(data.nodes.map(function (n, i) {
+  var node = {id: i, label: n[0], x: n[1], y: n[2], size: n[3], group: n[5], title: n[6]};
+  if (n[4]) {
+    node.color = n[4];
+  }
+  return node;
+}));
+var edges = new vis.DataSet();
+function showEdges(minWeight) {
+  edges.clear();
+  // Edges are sorted by descending weight, so stop at the first lighter one
+  var visible = [];
+  for (var i = 0; i < data.edges.length && data.edges[i][2] >= minWeight; i++) {
+    var e = data.edges[i];
+    visible.push({from: e[0], to: e[1], value: e[2], title: "Shared scenes: " + e[2]});
+  }
+  edges.add(visible);
+  document.getElementById("min-weight-value").textContent = minWeight;
+}
+showEdges({{ initial_weight }});
+document.getElementById("min-weight").addEventListener("input", function (event) {
+  showEdges(Number(event.target.value));
+});
+new vis.Network(document.getElementById("network"), {nodes: nodes, edges: edges}, {
+  physics: false,
+  layout: {improvedLayout: false},
+  interaction: {hover: true, hideEdgesOnDrag: true, hideEdgesOnZoom: true},
+  nodes: {shape: "dot", font: {size: 12}},
+  edges: {color: {color: "#999999"}, smooth: false, scaling: {min: 1, max: 10}}
+});
+</script>
+</body>
+</html>
+""")
+
+
+def build_network_payload(data, min_weight=1, max_edges=None, scale=450):
+    G = build_interaction_graph(data)
+
+    network_metrics = data["screenplay"].get("network_metrics") or compute_network_metrics(data)
+    community_ids = {
+        name: i for i, members in enumerate(network_metrics["communities"]) for name in members
+    }
+    top_3_central_chars = set(top_central_characters(network_metrics, measure="degree", count=3))
+
+    # Level of detail: drop light edges, then keep only the heaviest max_edges
+    edges = sorted(
+        ((u, v, d["weight"]) for u, v, d in G.edges(data=True) if d["weight"] >= min_weight),
+        key=lambda edge: edge[2],
+        reverse=True,
+    )
+    if max_edges is not None:
+        edges = edges[:max_edges]
+
+    pos = nx.spring_layout(G, weight="weight", seed=1, scale=scale) if len(G) else {}
+    names = list(G.nodes())
+    index = {name: i for i, name in enumerate(names)}
+    nodes = [
+        [
+            name,
+            int(round(pos[name][0])),
+            int(round(pos[name][1])),
+            round(max(5, G.nodes[name].get("size", 0) / 5), 1),
+            "red" if name in top_3_central_chars else None,
+            community_ids.get(name, -1),
+            f"PageRank: {network_metrics['pagerank'].get(name, 0):.4f}\nBetweenness: {network_metrics['betweenness'].get(name, 0):.4f}",
+        ]
+        for name in names
+    ]
+    return {
+        "nodes": nodes,
+        "edges": [[index[u], index[v], weight] for u, v, weight in edges],
+    }
+
+
+def export_network_html(data, output_path, min_weight=1, max_edges=None, width=1000, height=1000):
+    payload = build_network_payload(data, min_weight=min_weight, max_edges=max_edges, scale=min(width, height) * 0.45)
+    weights = [edge[2] for edge in payload["edges"]] or [min_weight]
+    html = page_template.render(
+        title=data["screenplay"]["title"],
+        vis_url=VIS_NETWORK_URL,
+        width=width,
+        height=height,
+        min_weight=min(weights),
+        max_weight=max(weights),
+        initial_weight=min(weights),
+        # Compact separators, and keep "</script>" in names from closing the tag
+        payload=json.dumps(payload, separators=(",", ":")).replace("</", "<\\/"),
+    )
+    with open(output_path, "w") as f:
+        f.write(html)
+    return output_path
@@ -0,0 +1,262 @@
+import os
+import json
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+from helpers.scene_headings import compact_screenplay, load_screenplay_data
+from concurrent.futures import ProcessPoolExecutor
+
+
+def build_adjacency(data):
+    return scene_adjacency(
+        [char["name"] for char in data["screenplay"]["characters"]],
+        [scene["characters"] for scene in data["screenplay"]["scenes"]],
+    )
+
+
+def scene_adjacency(names, scene_characters):
+    # Characters are nodes, edge weights count the scenes two characters share
+    names = list(names)
+    index = {name: i for i, name in enumerate(names)}
+    rows = []
+    cols = []
+
+    for characters in scene_characters:
+        for name in characters:
+            if name not in index:
+                index[name] = len(names)
+                names.append(name)
+        ids = sorted({index[name] for name in characters})
+        for i in range(len(ids)):
+            for j in range(i + 1, len(ids)):
+                rows.append(ids[i])
+                cols.append(ids[j])
+
+    n = len(names)
+    weights = np.ones(2 * len(rows))
+    # Duplicate (row, col) pairs are summed when converting to CSR
+    adjacency = sp.coo_matrix(
+        (weights, (rows + cols, cols + rows)), shape=(n, n)
+    ).tocsr()
+    return names, adjacency
+
+
+def adjacency_graph(names, adjacency, sizes):
+    # networkx view of the adjacency for layouts and drawing; node "size" is
+    # the character's dialogue line count
+    G = nx.Graph()
+    for name in names:
+        G.add_node(name, size=sizes.get(name, 0))
+    upper = sp.triu(adjacency, k=1).tocoo()
+    for i, j, weight in zip(upper.row.tolist(), upper.col.tolist(), upper.data.tolist()):
+        G.add_edge(names[i], names[j], weight=int(weight))
+    return G
+
+
+def build_interaction_graph(data):
+    names, adjacency = build_adjacency(data)
+    sizes = {char["name"]: char["dialogue_lines"] for char in data["screenplay"]["characters"]}
+    return adjacency_graph(names, adjacency, sizes)
+
+
+def degree_centrality(adjacency):
+    n = adjacency.shape[0]
+    degrees = np.diff(adjacency.indptr).astype(float)
+    if n <= 1:
+        return np.ones(n)
+    return degrees / (n - 1)
+
+
+def eigenvector_centrality(adjacency, max_iter=100, tol=1e-6, weighted=False):
+    # Power iteration on (A + I), which converges on bipartite graphs where
+    # plain A oscillates. Returns the last iterate instead of raising.
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0), True, 0
+    matrix = adjacency if weighted else (adjacency > 0).astype(float)
+    x = np.ones(n) / n
+    for iteration in range(1, max_iter + 1):
+        x_last = x
+        x = x_last + matrix @ x_last
+        norm = np.linalg.norm(x)
+        if norm == 0:
+            return x, True, iteration
+        x = x / norm
+        if np.abs(x - x_last).sum() < n * tol:
+            return x, True, iteration
+    return x, False, max_iter
+
+
+def pagerank(adjacency, alpha=0.85, max_iter=100, tol=1e-6):
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0), True, 0
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    transition = (sp.diags(inverse) @ adjacency).T.tocsr()
+
+    x = np.ones(n) / n
+    for iteration in range(1, max_iter + 1):
+        x_last = x
+        dangling_mass = x_last[dangling].sum() / n
+        x = alpha * (transition @ x_last + dangling_mass) + (1 - alpha) / n
+        if np.abs(x - x_last).sum() < n * tol:
+            return x, True, iteration
+    return x, False, max_iter
+
+
+def betweenness_centrality(adjacency, samples=None, seed=0):
+    # Brandes' algorithm over the CSR structure (unweighted shortest paths).
+    # With samples set, only that many random sources are used and the
+    # result is extrapolated to the full graph.
+    n = adjacency.shape[0]
+    indptr = adjacency.indptr.tolist()
+    indices = adjacency.indices.tolist()
+    betweenness = [0.0] * n
+
+    if samples is None or samples >= n:
+        sources = range(n)
+        sample_count = n
+    else:
+        rng = np.random.default_rng(seed)
+        sources = rng.choice(n, size=samples, replace=False).tolist()
+        sample_count = samples
+
+    for source in sources:
+        stack = []
+        predecessors = [[] for _ in range(n)]
+        sigma = [0] * n
+        sigma[source] = 1
+        distance = [-1] * n
+        distance[source] = 0
+        queue = [source]
+        head = 0
+        while head < len(queue):
+            v = queue[head]
+            head += 1
+            stack.append(v)
+            for w in indices[indptr[v]:indptr[v + 1]]:
+                if distance[w] < 0:
+                    distance[w] = distance[v] + 1
+                    queue.append(w)
+                if distance[w] == distance[v] + 1:
+                    sigma[w] += sigma[v]
+                    predecessors[w].append(v)
+
+        delta = [0.0] * n
+        while stack:
+            w = stack.pop()
+            for v in predecessors[w]:
+                delta[v] += sigma[v] / sigma[w] * (1 + delta[w])
+            if w != source:
+                betweenness[w] += delta[w]
+
+    betweenness = np.array(betweenness)
+    if n > 2 and sample_count:
+        betweenness *= 1 / ((n - 1) * (n - 2))
+        betweenness *= n / sample_count
+    return betweenness
+
+
+def label_propagation_communities(adjacency, max_iter=100, seed=0):
+    # Weighted asynchronous label propagation; ties go to the smallest label
+    # so that results are reproducible for a given seed.
+    n = adjacency.shape[0]
+    indptr = adjacency.indptr.tolist()
+    indices = adjacency.indices.tolist()
+    weights = adjacency.data.tolist()
+    labels = list(range(n))
+    rng = np.random.default_rng(seed)
+
+    for _ in range(max_iter):
+        changed = False
+        for node in rng.permutation(n).tolist():
+            label_weights = {}
+            for k in range(indptr[node], indptr[node + 1]):
+                label = labels[indices[k]]
+                label_weights[label] = label_weights.get(label, 0) + weights[k]
+            if not label_weights:
+                continue
+            best = max(label_weights.values())
+            candidates = [label for label, weight in label_weights.items() if weight == best]
+            if labels[node] in candidates:
+                continue
+            labels[node] = min(candidates)
+            changed = True
+        if not changed:
+            break
+
+    communities = {}
+    for node, label in enumerate(labels):
+        communities.setdefault(label, []).append(node)
+    return sorted(communities.values(), key=lambda members: (-len(members), members[0]))
+
+
+def compute_network_metrics(data, max_iter=100, tol=1e-6, betweenness_samples=None, seed=0):
+    names, adjacency = build_adjacency(data)
+    return adjacency_metrics(
+        names, adjacency, max_iter=max_iter, tol=tol, betweenness_samples=betweenness_samples, seed=seed
+    )
+
+
+def adjacency_metrics(names, adjacency, max_iter=100, tol=1e-6, betweenness_samples=None, seed=0):
+    degree = degree_centrality(adjacency)
+    eigenvector, eigenvector_converged, eigenvector_iterations = eigenvector_centrality(
+        adjacency, max_iter=max_iter, tol=tol
+    )
+    rank, pagerank_converged, pagerank_iterations = pagerank(
+        adjacency, max_iter=max_iter, tol=tol
+    )
+    betweenness = betweenness_centrality(adjacency, samples=betweenness_samples, seed=seed)
+    communities = label_propagation_communities(adjacency, max_iter=max_iter, seed=seed)
+
+    def by_name(values):
+        return {name: float(value) for name, value in zip(names, values)}
+
+    return {
+        "degree": by_name(degree),
+        "eigenvector": by_name(eigenvector),
+        "pagerank": by_name(rank),
+        "betweenness": by_name(betweenness),
+        "communities": [[names[node] for node in members] for members in communities],
+        "convergence": {
+            "eigenvector": {"converged": eigenvector_converged, "iterations": eigenvector_iterations},
+            "pagerank": {"converged": pagerank_converged, "iterations": pagerank_iterations},
+        },
+        "betweenness_samples": betweenness_samples,
+    }
+
+
+def top_central_characters(network_metrics, measure="pagerank", count=5):
+    scores = network_metrics[measure]
+    return sorted(scores, key=scores.get, reverse=True)[:count]
+
+
+def _update_screenplay_file(path, options):
+    try:
+        data = load_screenplay_data(path)
+        data["screenplay"]["network_metrics"] = compute_network_metrics(data, **options)
+        with open(path, "w") as f:
+            json.dump(compact_screenplay(data), f, indent=2)
+        return path, None
+    except Exception as e:
+        return path, str(e)
+
+
+def compute_corpus_network_metrics(paths, workers=None, **options):
+    # Each screenplay is independent, so the corpus is spread across processes
+    # and the metrics are written back into every JSON file in place.
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        return [_update_screenplay_file(path, options) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_update_screenplay_file, paths, [options] * len(paths)))
+
+
+def list_screenplay_files(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(".json")
+    )
@@ -0,0 +1,251 @@
+import re
+import json
+import numpy as np
+
+tag_pattern = re.compile(r"<[^>]+>")
+setting_pattern = re.compile(
+    r"^(INT\.?\s*/\s*EXT\.?|EXT\.?\s*/\s*INT\.?|I\s*/\s*E\.?|INT\.|EXT\.|(?:INTERIOR|EXTERIOR|INSIDE|OUTSIDE)\b)\s*[-.:]?\s*"
+)
+separator_pattern = re.compile(r"\s+[-–—]+\s+|\s*--\s*")
+
+settings = {
+    "INT.": "INT",
+    "INTERIOR": "INT",
+    "INSIDE": "INT",
+    "EXT.": "EXT",
+    "EXTERIOR": "EXT",
+    "OUTSIDE": "EXT",
+}
+
+times_of_day = {
+    "DAY", "NIGHT", "MORNING", "AFTERNOON", "EVENING", "DAWN", "DUSK", "SUNRISE",
+    "SUNSET", "NOON", "MIDNIGHT", "CONTINUOUS", "LATER", "MOMENTS", "SAME", "NEXT",
+}
+
+# Codes used in the categorical columns when a heading has no value
+MISSING = -1
+
+
+def parse_scene_heading(line):
+    heading = " ".join(tag_pattern.sub("", line).split()).upper()
+
+    setting = None
+    match = setting_pattern.match(heading)
+    if match:
+        token = re.sub(r"\s+", "", match.group(1))
+        setting = settings.get(token, "INT/EXT")
+        heading = heading[match.end():]
+
+    time_of_day = None
+    parts = [part for part in separator_pattern.split(heading) if part]
+    if len(parts) > 1 and parts[-1].split() and parts[-1].split()[0].strip(".,()") in times_of_day:
+        time_of_day = parts.pop().strip(" .")
+
+    location = " - ".join(part.strip(" .,") for part in parts).strip(" -") or None
+    return {"setting": setting, "location": location, "time_of_day": time_of_day}
+
+
+class CategoryTable:
+    # Interns strings to dense integer codes in first-seen order
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        if value is None:
+            return MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def value(self, code):
+        return None if code == MISSING else self.values[code]
+
+
+def encode_categories(characters, scenes):
+    tables = {
+        "settings": CategoryTable(),
+        "locations": CategoryTable(),
+        "times_of_day": CategoryTable(),
+        "characters": CategoryTable(char["name"] for char in characters),
+    }
+    columns = {"setting": [], "location": [], "time_of_day": [], "characters": []}
+
+    for scene in scenes:
+        heading = scene.get("heading") or parse_scene_heading(scene["location"])
+        columns["setting"].append(tables["settings"].code(heading["setting"]))
+        columns["location"].append(tables["locations"].code(heading["location"]))
+        columns["time_of_day"].append(tables["times_of_day"].code(heading["time_of_day"]))
+        columns["characters"].append([tables["characters"].code(name) for name in scene["characters"]])
+
+    return {
+        "categories": {name: table.values for name, table in tables.items()},
+        "scene_codes": columns,
+    }
+
+
+# Keys of a parsed scene, in parser order; only scenes of exactly this shape
+# are stored as codes
+scene_keys = ("scene_number", "location", "characters", "dialogue_lines", "dialogue_words")
+
+
+def compact_screenplay(data):
+    # Saved form: the scenes list is dropped and every per-scene string (raw
+    # heading, character names, dialogue count keys) becomes a code into the
+    # categories tables. expand_screenplay reverses it exactly. Anything that
+    # would not round-trip (older saves, hand-edited scenes) is left as is.
+    screenplay = data["screenplay"]
+    scenes = screenplay.get("scenes")
+    if scenes is None or "categories" not in screenplay or "scene_codes" not in screenplay:
+        return data
+
+    characters = screenplay["categories"]["characters"]
+    codes = {name: code for code, name in enumerate(characters)}
+    headings = CategoryTable()
+    columns = {"heading": [], "dialogue_lines": [], "dialogue_words": []}
+    for number, scene in enumerate(scenes, start=1):
+        if tuple(scene) != scene_keys or scene["scene_number"] != number:
+            return data
+        names = list(scene["characters"]) + list(scene["dialogue_lines"]) + list(scene["dialogue_words"])
+        if any(name not in codes for name in names):
+            return data
+        columns["heading"].append(headings.code(scene["location"]))
+        columns["dialogue_lines"].append({str(codes[name]): count for name, count in scene["dialogue_lines"].items()})
+        columns["dialogue_words"].append({str(codes[name]): count for name, count in scene["dialogue_words"].items()})
+    scene_characters = [[codes[name] for name in scene["characters"]] for scene in scenes]
+    if screenplay["scene_codes"].get("characters") != scene_characters:
+        return data
+
+    compact = {}
+    for key, value in screenplay.items():
+        if key == "scenes":
+            continue
+        if key == "categories":
+            value = {**value, "headings": headings.values}
+        elif key == "scene_codes":
+            value = {**value, **columns}
+        compact[key] = value
+    return {**data, "screenplay": compact}
+
+
+def expand_screenplay(data):
+    screenplay = data["screenplay"]
+    if "scenes" in screenplay or "heading" not in screenplay.get("scene_codes", {}):
+        return data
+
+    categories = dict(screenplay["categories"])
+    headings = categories.pop("headings")
+    columns = dict(screenplay["scene_codes"])
+    heading_codes = columns.pop("heading")
+    lines = columns.pop("dialogue_lines")
+    words = columns.pop("dialogue_words")
+    names = categories["characters"]
+    scenes = [
+        {
+            "scene_number": number,
+            "location": headings[heading],
+            "characters": [names[code] for code in scene_characters],
+            "dialogue_lines": {names[int(code)]: count for code, count in scene_lines.items()},
+            "dialogue_words": {names[int(code)]: count for code, count in scene_words.items()},
+        }
+        for number, (heading, scene_characters, scene_lines, scene_words) in enumerate(
+            zip(heading_codes, columns["characters"], lines, words), start=1
+        )
+    ]
+
+    # The scenes list goes back where parse_screenplay puts it
+    expanded = {}
+    for key, value in screenplay.items():
+        if key == "categories":
+            value = categories
+        elif key == "scene_codes":
+            value = columns
+        expanded[key] = value
+        if key == "characters":
+            expanded["scenes"] = scenes
+    expanded.setdefault("scenes", scenes)
+    return {**data, "screenplay": expanded}
+
+
+def load_screenplay_data(path):
+    with open(path, "r") as f:
+        return expand_screenplay(json.load(f))
+
+
+def _categorical(data):
+    screenplay = data["screenplay"]
+    if "categories" in screenplay and "scene_codes" in screenplay:
+        return screenplay["categories"], screenplay["scene_codes"]
+    encoded = encode_categories(screenplay["characters"], screenplay["scenes"])
+    return encoded["categories"], encoded["scene_codes"]
+
+
+def decode_headings(data):
+    # Per-scene heading dicts rebuilt from the coded columns, which is how
+    # headings are stored in saved screenplays
+    return decode_heading_columns(*_categorical(data))
+
+
+def decode_heading_columns(categories, codes):
+    tables = {name: CategoryTable(values) for name, values in categories.items()}
+    return [
+        {
+            "setting": tables["settings"].value(setting),
+            "location": tables["locations"].value(location),
+            "time_of_day": tables["times_of_day"].value(time_of_day),
+        }
+        for setting, location, time_of_day in zip(codes["setting"], codes["location"], codes["time_of_day"])
+    ]
+
+
+def scene_dialogue_totals(data):
+    return np.array(
+        [sum(scene.get("dialogue_lines", {}).values()) for scene in data["screenplay"]["scenes"]],
+        dtype=np.int64,
+    )
+
+
+def corpus_location_stats(paths):
+    # Each screenplay's local location codes are remapped onto one shared
+    # table, so the corpus group-by stays a bincount over integer columns
+    locations = CategoryTable()
+    scene_counts = np.zeros(0, dtype=np.int64)
+    line_counts = np.zeros(0, dtype=np.int64)
+    screenplay_counts = np.zeros(0, dtype=np.int64)
+
+    for path in paths:
+        data = load_screenplay_data(path)
+        categories, codes = _categorical(data)
+        remap = np.array([locations.code(location) for location in categories["locations"]], dtype=np.int64)
+        if len(locations) > len(scene_counts):
+            grow = len(locations) - len(scene_counts)
+            scene_counts = np.concatenate([scene_counts, np.zeros(grow, dtype=np.int64)])
+            line_counts = np.concatenate([line_counts, np.zeros(grow, dtype=np.int64)])
+            screenplay_counts = np.concatenate([screenplay_counts, np.zeros(grow, dtype=np.int64)])
+
+        location_codes = np.array(codes["location"], dtype=np.int64)
+        known = location_codes != MISSING
+        global_codes = remap[location_codes[known]]
+        scene_counts += np.bincount(global_codes, minlength=len(locations))
+        line_counts += np.bincount(
+            global_codes, weights=scene_dialogue_totals(data)[known], minlength=len(locations)
+        ).astype(np.int64)
+        screenplay_counts[np.unique(global_codes)] += 1
+
+    return {
+        location: {
+            "scenes": int(scene_counts[code]),
+            "dialogue_lines": int(line_counts[code]),
+            "screenplays": int(screenplay_counts[code]),
+        }
+        for code, location in enumerate(locations.values)
+    }
@@ -0,0 +1,304 @@
+import sys
+import json
+import functools
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from helpers.network_metrics import adjacency_graph, adjacency_metrics, scene_adjacency
+from helpers.dynamic_network import scene_window_metrics
+from helpers.timeline import timeline_from_scenes
+from helpers.scene_headings import compact_screenplay, decode_heading_columns, expand_screenplay, parse_scene_heading
+
+# Keys of data["screenplay"] that map onto Screenplay fields; anything else
+# (network_metrics, dynamic_network, ...) is kept verbatim in Screenplay.extra
+screenplay_fields = (
+    "title",
+    "characters",
+    "scenes",
+    "dialogue_interactions",
+    "global_characters",
+    "global_dialogues",
+    "script_content",
+    "categories",
+    "scene_codes",
+)
+character_fields = ("name", "dialogue_lines", "scenes")
+scene_fields = ("scene_number", "location", "heading", "characters", "dialogue_lines", "dialogue_words")
+
+
+def memoized(method):
+    # cached_property needs an instance __dict__, which slotted classes lack
+    name = method.__name__
+
+    @functools.wraps(method)
+    def getter(self):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = method(self)
+            return value
+
+    return property(getter)
+
+
+def _require(condition, message):
+    if not condition:
+        raise ValueError(message)
+
+
+# Scenes and characters with the same keys share one key_order tuple
+_key_orders = {}
+
+
+def _split_extra(data, fields):
+    # Unknown keys are kept verbatim, and the keys that were present are
+    # recorded so that optional ones absent from the input stay absent
+    extra = {key: value for key, value in data.items() if key not in fields} or None
+    key_order = tuple(data)
+    return extra, _key_orders.setdefault(key_order, key_order)
+
+
+def _ordered(values, key_order):
+    # Keys appear in the order they were loaded, new ones after them
+    ordered = [key for key in key_order if key in values]
+    ordered += [key for key in values if key not in key_order]
+    return {key: values[key] for key in ordered}
+
+
+def _with_extra(values, extra, key_order):
+    # Loaded objects write back exactly the keys they were read with (nulls
+    # included); objects built in code write the fields that are set
+    if key_order is None:
+        return {key: value for key, value in values.items() if value is not None}
+    values = {**values, **(extra or {})}
+    return {key: values[key] for key in key_order}
+
+
+def _code_columns(columns):
+    # scene_codes columns as int arrays; per-scene lists (the characters
+    # column) become one array per scene
+    return {
+        name: [array("i", codes) for codes in column] if column and isinstance(column[0], list) else array("i", column)
+        for name, column in columns.items()
+    }
+
+
+def _column_lists(columns):
+    return {
+        name: [codes.tolist() for codes in column] if isinstance(column, list) else column.tolist()
+        for name, column in columns.items()
+    }
+
+
+@dataclass(slots=True)
+class Heading:
+    setting: str | None
+    location: str | None
+    time_of_day: str | None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("setting"), data.get("location"), data.get("time_of_day"))
+
+    def to_dict(self):
+        return {"setting": self.setting, "location": self.location, "time_of_day": self.time_of_day}
+
+
+@dataclass(slots=True)
+class Character:
+    name: str
+    dialogue_lines: int = 0
+    scenes: array = field(default_factory=lambda: array("I"))
+    extra: dict | None = None
+    key_order: tuple | None = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data):
+        _require(isinstance(data, dict) and isinstance(data.get("name"), str), f"Invalid character data: {data}")
+        _require(isinstance(data.get("dialogue_lines", 0), int), f"Invalid dialogue_lines for {data['name']}")
+        return cls(
+            sys.intern(data["name"]),
+            data.get("dialogue_lines", 0),
+            array("I", data.get("scenes", [])),
+            *_split_extra(data, character_fields),
+        )
+
+    def to_dict(self):
+        values = {"name": self.name, "dialogue_lines": self.dialogue_lines, "scenes": self.scenes.tolist()}
+        return _with_extra(values, self.extra, self.key_order)
+
+
+@dataclass(slots=True)
+class Scene:
+    scene_number: int
+    location: str | None = None
+    characters: tuple = ()
+    heading: Heading | None = None
+    dialogue_lines: dict | None = None
+    dialogue_words: dict | None = None
+    extra: dict | None = None
+    key_order: tuple | None = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data):
+        _require(isinstance(data, dict) and isinstance(data.get("scene_number"), int), f"Invalid scene data: {data}")
+        _require(isinstance(data.get("characters", []), list), f"Invalid characters in scene {data['scene_number']}")
+        heading = data.get("heading")
+        return cls(
+            data["scene_number"],
+            data.get("location"),
+            tuple(sys.intern(name) for name in data.get("characters", [])),
+            Heading.from_dict(heading) if heading is not None else None,
+            _intern_keys(data.get("dialogue_lines")),
+            _intern_keys(data.get("dialogue_words")),
+            *_split_extra(data, scene_fields),
+        )
+
+    def to_dict(self):
+        values = {
+            "scene_number": self.scene_number,
+            "location": self.location,
+            "heading": self.heading.to_dict() if self.heading is not None else None,
+            "characters": list(self.characters),
+            "dialogue_lines": dict(self.dialogue_lines) if self.dialogue_lines is not None else None,
+            "dialogue_words": dict(self.dialogue_words) if self.dialogue_words is not None else None,
+        }
+        return _with_extra(values, self.extra, self.key_order)
+
+
+def _intern_keys(counts):
+    if counts is None:
+        return None
+    return {sys.intern(name): value for name, value in counts.items()}
+
+
+@dataclass(slots=True)
+class Screenplay:
+    title: str | None = None
+    characters: list = field(default_factory=list)
+    scenes: list = field(default_factory=list)
+    dialogue_interactions: dict | None = None
+    global_characters: list | None = None
+    global_dialogues: list | None = None
+    script_content: str | None = None
+    categories: dict | None = None
+    scene_codes: dict | None = None
+    extra: dict = field(default_factory=dict)
+    key_order: tuple | None = field(default=None, repr=False, compare=False)
+    coded: bool = field(default=False, repr=False, compare=False)
+    _cache: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data, script_content=None):
+        _require(isinstance(data, dict) and isinstance(data.get("screenplay"), dict), "Missing 'screenplay' section")
+        # Saved files store scenes as codes; the model holds them decoded
+        expanded = expand_screenplay(data)
+        coded = expanded is not data
+        data = expanded
+        screenplay = data["screenplay"]
+        _require(isinstance(screenplay.get("characters", []), list), "characters data is not in the expected format")
+        _require(isinstance(screenplay.get("scenes", []), list), "scenes data is not in the expected format")
+
+        interactions = screenplay.get("dialogue_interactions")
+        if interactions is not None:
+            interactions = {sys.intern(name): _intern_keys(counts) for name, counts in interactions.items()}
+        global_characters = screenplay.get("global_characters")
+        if global_characters is not None:
+            global_characters = [sys.intern(name) for name in global_characters]
+        categories = screenplay.get("categories")
+        if categories is not None:
+            categories = {name: [sys.intern(value) for value in values] for name, values in categories.items()}
+        scene_codes = screenplay.get("scene_codes")
+        if scene_codes is not None:
+            scene_codes = _code_columns(scene_codes)
+
+        return cls(
+            title=screenplay.get("title"),
+            characters=[Character.from_dict(char) for char in screenplay.get("characters", [])],
+            scenes=[Scene.from_dict(scene) for scene in screenplay.get("scenes", [])],
+            dialogue_interactions=interactions,
+            global_characters=global_characters,
+            global_dialogues=screenplay.get("global_dialogues"),
+            script_content=script_content if script_content is not None else screenplay.get("script_content"),
+            categories=categories,
+            scene_codes=scene_codes,
+            extra={key: value for key, value in screenplay.items() if key not in screenplay_fields},
+            # script_content passed separately counts as present
+            key_order=tuple(screenplay) + (("script_content",) if script_content is not None and "script_content" not in screenplay else ()),
+            coded=coded,
+        )
+
+    def to_dict(self):
+        values = {
+            "title": self.title,
+            "characters": [char.to_dict() for char in self.characters],
+            "scenes": [scene.to_dict() for scene in self.scenes],
+            "dialogue_interactions": self.dialogue_interactions,
+            "global_characters": self.global_characters,
+            "global_dialogues": self.global_dialogues,
+            "categories": self.categories,
+            "scene_codes": _column_lists(self.scene_codes) if self.scene_codes is not None else None,
+            "script_content": self.script_content,
+            **self.extra,
+        }
+        if self.key_order is not None:
+            # Loaded: the keys read (nulls included), then keys added to extra
+            values = {key: value for key, value in values.items() if key in self.key_order or key in self.extra}
+        else:
+            values = {key: value for key, value in values.items() if value is not None or key in self.extra}
+        data = {"screenplay": _ordered(values, self.key_order or ())}
+        return compact_screenplay(data) if self.coded else data
+
+    def invalidate(self):
+        self._cache.clear()
+
+    # Derived views read the slotted fields directly and are built once
+
+    @memoized
+    def graph(self):
+        names, adjacency = self.adjacency
+        return adjacency_graph(names, adjacency, {char.name: char.dialogue_lines for char in self.characters})
+
+    @memoized
+    def adjacency(self):
+        return scene_adjacency([char.name for char in self.characters], [scene.characters for scene in self.scenes])
+
+    @memoized
+    def network_metrics(self):
+        return self.extra.get("network_metrics") or adjacency_metrics(*self.adjacency)
+
+    @memoized
+    def dynamic_network(self):
+        return self.extra.get("dynamic_network") or scene_window_metrics([scene.characters for scene in self.scenes])
+
+    @memoized
+    def timeline(self):
+        return timeline_from_scenes(
+            [char.name for char in self.characters],
+            [
+                (scene.scene_number, scene.characters, scene.dialogue_lines or {}, scene.dialogue_words or {})
+                for scene in self.scenes
+            ],
+        )
+
+    @memoized
+    def headings(self):
+        # Decoded from the coded columns; older files without them fall back
+        # to their stored per-scene heading or the raw heading text
+        if self.categories is not None and self.scene_codes is not None:
+            return [Heading.from_dict(heading) for heading in decode_heading_columns(self.categories, self.scene_codes)]
+        return [scene.heading or Heading.from_dict(parse_scene_heading(scene.location or "")) for scene in self.scenes]
+
+    @memoized
+    def word_counts(self):
+        return Counter((self.script_content or "").lower().split())
+
+
+def load_screenplay(path):
+    with open(path, "r") as f:
+        return Screenplay.from_dict(json.load(f))
+
+
+def save_screenplay(screenplay, path):
+    with open(path, "w") as f:
+        json.dump(screenplay.to_dict(), f, indent=2)
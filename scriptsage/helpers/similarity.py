@@ -0,0 +1,285 @@
+import os
+import re
+import json
+import math
+import pickle
+import heapq
+import hashlib
+import numpy as np
+
+# MinHash parameters: 128 permutations split into 32 LSH bands of 4 rows,
+# which puts the LSH candidate threshold at a Jaccard similarity of ~0.42.
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+# similar() looks up the query's highest-weighted TF-IDF terms in the
+# inverted index; documents sharing none of them are never scored
+QUERY_TERMS = 32
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+token_pattern = re.compile(r"[a-z0-9']+")
+
+
+def screenplay_text(data):
+    # script_content holds both dialogue and action lines; older files only
+    # carry the extracted dialogue
+    screenplay = data["screenplay"]
+    if screenplay.get("script_content"):
+        return screenplay["script_content"]
+    return "\n".join(screenplay.get("global_dialogues", []))
+
+
+def tokenize(text):
+    return token_pattern.findall(text.lower())
+
+
+def minhash_signature(tokens):
+    shingles = {
+        " ".join(tokens[i:i + SHINGLE_SIZE])
+        for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))
+    }
+    hashes = np.array(
+        [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+            for shingle in shingles
+        ],
+        dtype=np.uint64,
+    )
+    if len(hashes) == 0:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    permuted = ((np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=0)
+
+
+def estimate_jaccard(signature_a, signature_b):
+    return float(np.mean(signature_a == signature_b))
+
+
+def _band_keys(signature):
+    return [
+        hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        for band in range(BANDS)
+    ]
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self.documents = {}  # doc_id -> {"title", "path", "mtime", "term_counts", "signature"}
+        self.postings = {}  # term -> doc_ids containing it; its size is the term's DF
+        self.buckets = [{} for _ in range(BANDS)]
+        self._vectors = {}
+
+    def __getstate__(self):
+        # TF-IDF vectors depend on the whole corpus and are rebuilt on demand
+        state = self.__dict__.copy()
+        state.pop("_vectors", None)
+        return state
+
+    def __setstate__(self, state):
+        # Indexes pickled before the inverted index only kept DF counts
+        document_frequency = state.pop("document_frequency", None)
+        self.__dict__.update(state)
+        self._vectors = {}
+        if document_frequency is not None:
+            self.postings = {}
+            for doc_id, document in self.documents.items():
+                for term in document["term_counts"]:
+                    self.postings.setdefault(term, set()).add(doc_id)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, doc_id, title, text, path=None, mtime=None):
+        if doc_id in self.documents:
+            self.remove(doc_id)
+        self._vectors.clear()
+
+        tokens = tokenize(text)
+        term_counts = {}
+        for token in tokens:
+            term_counts[token] = term_counts.get(token, 0) + 1
+        for term in term_counts:
+            self.postings.setdefault(term, set()).add(doc_id)
+
+        signature = minhash_signature(tokens)
+        for band, key in enumerate(_band_keys(signature)):
+            self.buckets[band].setdefault(key, set()).add(doc_id)
+
+        self.documents[doc_id] = {
+            "title": title,
+            "path": path,
+            "mtime": mtime,
+            "term_counts": term_counts,
+            "signature": signature,
+        }
+
+    def remove(self, doc_id):
+        document = self.documents.pop(doc_id)
+        self._vectors.clear()
+        for term in document["term_counts"]:
+            self.postings[term].discard(doc_id)
+            if not self.postings[term]:
+                del self.postings[term]
+        for band, key in enumerate(_band_keys(document["signature"])):
+            members = self.buckets[band].get(key)
+            if members is not None:
+                members.discard(doc_id)
+                if not members:
+                    del self.buckets[band][key]
+
+    def add_file(self, path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        self.add(
+            os.path.basename(path),
+            data["screenplay"]["title"],
+            screenplay_text(data),
+            path=path,
+            mtime=os.path.getmtime(path),
+        )
+
+    def update_from_directory(self, directory):
+        # Only new or modified screenplay files are (re)indexed
+        seen = set()
+        added = 0
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(directory, name)
+            seen.add(name)
+            document = self.documents.get(name)
+            if document is None or document["mtime"] != os.path.getmtime(path):
+                self.add_file(path)
+                added += 1
+        for doc_id in [doc_id for doc_id in self.documents if doc_id not in seen]:
+            self.remove(doc_id)
+        return added
+
+    def candidates(self, doc_id):
+        # Near-duplicate candidates: documents sharing a MinHash/LSH band
+        signature = self.documents[doc_id]["signature"]
+        found = set()
+        for band, key in enumerate(_band_keys(signature)):
+            found.update(self.buckets[band].get(key, ()))
+        found.discard(doc_id)
+        return found
+
+    def _tfidf(self, doc_id):
+        # Smoothed IDF, so terms shared by every document keep some weight and
+        # identical documents score 1.0. Vectors are cached until the corpus
+        # changes, since every document's IDF shifts with it.
+        cached = self._vectors.get(doc_id)
+        if cached is not None:
+            return cached
+        total = len(self.documents)
+        vector = {
+            term: (1 + math.log(count)) * (math.log((1 + total) / (1 + len(self.postings[term]))) + 1)
+            for term, count in self.documents[doc_id]["term_counts"].items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        self._vectors[doc_id] = vector, norm
+        return vector, norm
+
+    def related_candidates(self, doc_id, terms=QUERY_TERMS):
+        # Related-document candidates: documents sharing any of the query's
+        # top TF-IDF terms. Terms no other document has are skipped; the rest
+        # are its rarest shared terms, so their postings stay short.
+        vector, _ = self._tfidf(doc_id)
+        shared = [term for term in vector if len(self.postings[term]) > 1]
+        found = set()
+        for term in heapq.nlargest(terms, shared, key=vector.get):
+            found.update(self.postings[term])
+        found.discard(doc_id)
+        return found
+
+    def cosine_similarity(self, doc_a, doc_b):
+        vector_a, norm_a = self._tfidf(doc_a)
+        vector_b, norm_b = self._tfidf(doc_b)
+        if norm_a == 0 or norm_b == 0:
+            return 0.0
+        if len(vector_a) > len(vector_b):
+            vector_a, vector_b = vector_b, vector_a
+        dot = sum(weight * vector_b.get(term, 0.0) for term, weight in vector_a.items())
+        return dot / (norm_a * norm_b)
+
+    def find(self, title):
+        query = title.lower()
+        sanitized = re.sub(r"\W+", "_", title).lower()
+        for doc_id, document in self.documents.items():
+            if document["title"].lower() == query or os.path.splitext(doc_id)[0].lower() == sanitized:
+                return doc_id
+        for doc_id, document in self.documents.items():
+            if query in document["title"].lower():
+                return doc_id
+        return None
+
+    def similar(self, doc_id, top=10):
+        signature = self.documents[doc_id]["signature"]
+        results = [
+            {
+                "doc_id": other,
+                "title": self.documents[other]["title"],
+                "cosine": self.cosine_similarity(doc_id, other),
+                "jaccard": estimate_jaccard(signature, self.documents[other]["signature"]),
+            }
+            for other in self.related_candidates(doc_id)
+        ]
+        results.sort(key=lambda result: result["cosine"], reverse=True)
+        return results[:top]
+
+    def duplicate_report(self, threshold=0.5):
+        pairs = []
+        parent = {}
+
+        def root(doc_id):
+            while parent.get(doc_id, doc_id) != doc_id:
+                doc_id = parent[doc_id]
+            return doc_id
+
+        for doc_id in sorted(self.documents):
+            signature = self.documents[doc_id]["signature"]
+            for other in sorted(self.candidates(doc_id)):
+                if other <= doc_id:
+                    continue
+                jaccard = estimate_jaccard(signature, self.documents[other]["signature"])
+                if jaccard < threshold:
+                    continue
+                pairs.append({
+                    "documents": [doc_id, other],
+                    "titles": [self.documents[doc_id]["title"], self.documents[other]["title"]],
+                    "jaccard": jaccard,
+                    "cosine": self.cosine_similarity(doc_id, other),
+                })
+                parent.setdefault(doc_id, doc_id)
+                parent.setdefault(other, other)
+                parent[root(other)] = root(doc_id)
+
+        groups = {}
+        for doc_id in parent:
+            groups.setdefault(root(doc_id), set()).add(doc_id)
+        pairs.sort(key=lambda pair: pair["jaccard"], reverse=True)
+        return {
+            "threshold": threshold,
+            "pairs": pairs,
+            "groups": sorted(sorted(members) for members in groups.values()),
+        }
+
+
+def load_index(path):
+    if not os.path.exists(path):
+        return SimilarityIndex()
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def save_index(index, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(index, f)
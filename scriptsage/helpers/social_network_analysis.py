@@ -1,52 +1,54 @@
-import networkx as nx
 from pyvis.network import Network
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 import time
+from helpers.network_metrics import build_interaction_graph, compute_network_metrics, top_central_characters
+from helpers.network_export import export_network_html
 
-def plot_social_network(data, output_path):
-    G = nx.Graph()
+def write_pyvis_html(data, html_path):
+    # Dialogue lines as node size, shared scenes as edge weight
+    G = build_interaction_graph(data)
 
-    # Add nodes with dialogue lines as node size
-    for char in data['screenplay']['characters']:
-        G.add_node(char['name'], size=char['dialogue_lines'])
-
-    # Add edges based on character interactions in scenes
-    for scene in data['screenplay']['scenes']:
-        for i in range(len(scene['characters'])):
-            for j in range(i + 1, len(scene['characters'])):
-                char1 = scene['characters'][i]
-                char2 = scene['characters'][j]
-                if G.has_edge(char1, char2):
-                    G[char1][char2]['weight'] += 1
-                else:
-                    G.add_edge(char1, char2, weight=1)
-
-    # Calculate centrality measures
-    eigenvector_centrality = nx.eigenvector_centrality(G)
-    centrality = nx.degree_centrality(G)
+    # Reuse centrality measures already stored in the screenplay output
+    network_metrics = data['screenplay'].get('network_metrics') or compute_network_metrics(data)
+    community_ids = {
+        name: i for i, members in enumerate(network_metrics['communities']) for name in members
+    }
 
     # Create a PyVis network
     net = Network(notebook=False, height="1000px", width="1000px")
 
     # Add nodes to the PyVis network
     for node in G.nodes():
-        net.add_node(node, size=max(5, G.nodes[node]['size'] / 5), title=f"Eigenvector Centrality: {eigenvector_centrality[node]:.4f}")
+        title = (
+            f"Eigenvector Centrality: {network_metrics['eigenvector'][node]:.4f}\n"
+            f"PageRank: {network_metrics['pagerank'][node]:.4f}\n"
+            f"Betweenness: {network_metrics['betweenness'][node]:.4f}\n"
+            f"Community: {community_ids[node]}"
+        )
+        net.add_node(node, size=max(5, G.nodes[node]['size'] / 5), title=title, group=community_ids[node])
 
     # Add edges to the PyVis network
     for edge in G.edges():
         net.add_edge(edge[0], edge[1], value=G.edges[edge]['weight'])
 
     # Highlight top 3 central characters
-    top_3_central_chars = sorted(centrality, key=centrality.get, reverse=True)[:3]
+    top_3_central_chars = top_central_characters(network_metrics, measure='degree', count=3)
     for char in top_3_central_chars:
         net.get_node(char)['color'] = 'red'
 
-    # Generate the network visualization
-    html_path = output_path.replace('.png', '.html')
     net.write_html(html_path, notebook=False)  # Use write_html instead of show
 
+def plot_social_network(data, output_path, static=True):
+    # Generate the network visualization; the static export is pre-laid-out
+    # with physics off, the pyvis page runs a force simulation in the browser
+    html_path = output_path.replace('.png', '.html')
+    if static:
+        export_network_html(data, html_path)
+    else:
+        write_pyvis_html(data, html_path)
+
     # Convert HTML to PNG using Selenium
     options = webdriver.ChromeOptions()
     options.add_argument('--headless')
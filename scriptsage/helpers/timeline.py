@@ -0,0 +1,120 @@
+import re
+import numpy as np
+
+
+class DialogueTimeline:
+    # Scene-by-character matrices with a leading zero row of prefix sums, so
+    # any scene range total is cumulative[end] - cumulative[start - 1].
+
+    def __init__(self, character_names, scene_numbers, lines, words, presence):
+        self.character_names = list(character_names)
+        self.scene_numbers = list(scene_numbers)
+        self.character_index = {name: i for i, name in enumerate(self.character_names)}
+        self.lines = lines
+        self.words = words
+        self.presence = presence
+        self.cumulative = {
+            measure: np.vstack([np.zeros((1, matrix.shape[1]), dtype=matrix.dtype), matrix.cumsum(axis=0)])
+            for measure, matrix in (("lines", lines), ("words", words), ("presence", presence))
+        }
+
+    def __len__(self):
+        return len(self.scene_numbers)
+
+    def _bounds(self, start, end):
+        # Scene numbers are 1-based and inclusive, matching the parsed output.
+        # A range past the last scene clamps to an empty range at the end.
+        start = 1 if start is None else min(max(1, start), len(self.scene_numbers) + 1)
+        end = len(self.scene_numbers) if end is None else min(len(self.scene_numbers), end)
+        return start, max(start - 1, end)
+
+    def totals(self, start=None, end=None, measure="lines"):
+        start, end = self._bounds(start, end)
+        cumulative = self.cumulative[measure]
+        return cumulative[end] - cumulative[start - 1]
+
+    def count(self, character, start=None, end=None, measure="lines"):
+        start, end = self._bounds(start, end)
+        cumulative = self.cumulative[measure][:, self.character_index[character]]
+        return int(cumulative[end] - cumulative[start - 1])
+
+    def share(self, character, start=None, end=None, measure="lines"):
+        total = int(self.totals(start, end, measure).sum())
+        if total == 0:
+            return 0.0
+        return self.count(character, start, end, measure) / total
+
+    def shares(self, start=None, end=None, measure="lines"):
+        totals = self.totals(start, end, measure)
+        total = totals.sum()
+        if total == 0:
+            return {name: 0.0 for name in self.character_names}
+        return {name: float(value / total) for name, value in zip(self.character_names, totals)}
+
+    def act_breakdown(self, acts, measure="lines"):
+        return [
+            {"start": start, "end": end, "shares": self.shares(start, end, measure)}
+            for start, end in acts
+        ]
+
+    def rolling(self, window, measure="lines"):
+        # Row i holds the totals of scenes i+1 .. i+window
+        cumulative = self.cumulative[measure]
+        window = max(1, min(window, len(self.scene_numbers)))
+        return cumulative[window:] - cumulative[:-window]
+
+
+def build_timeline(data):
+    return timeline_from_scenes(
+        [char["name"] for char in data["screenplay"]["characters"]],
+        [
+            # Screenplays saved before per-scene counts existed contribute zeros
+            (scene["scene_number"], scene["characters"], scene.get("dialogue_lines", {}), scene.get("dialogue_words", {}))
+            for scene in data["screenplay"]["scenes"]
+        ],
+    )
+
+
+def timeline_from_scenes(character_names, scenes):
+    # scenes holds (scene_number, characters, dialogue_lines, dialogue_words)
+    characters = list(character_names)
+    index = {name: i for i, name in enumerate(characters)}
+
+    for _, scene_characters, scene_lines, _ in scenes:
+        for name in list(scene_characters) + list(scene_lines):
+            if name not in index:
+                index[name] = len(characters)
+                characters.append(name)
+
+    shape = (len(scenes), len(characters))
+    lines = np.zeros(shape, dtype=np.int64)
+    words = np.zeros(shape, dtype=np.int64)
+    presence = np.zeros(shape, dtype=np.int64)
+
+    for row, (_, scene_characters, scene_lines, scene_words) in enumerate(scenes):
+        for name in scene_characters:
+            presence[row, index[name]] = 1
+        for name, count in scene_lines.items():
+            lines[row, index[name]] = count
+        for name, count in scene_words.items():
+            words[row, index[name]] = count
+
+    return DialogueTimeline(characters, [scene[0] for scene in scenes], lines, words, presence)
+
+
+act_pattern = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+))?\s*$")
+
+
+def parse_acts(spec):
+    # "1-30,31-80,81-120" -> [(1, 30), (31, 80), (81, 120)]; "5" is scene 5
+    acts = []
+    for part in spec.split(","):
+        match = act_pattern.match(part)
+        if not match:
+            raise ValueError(f"Invalid act range {part.strip()!r}: expected START-END, e.g. 1-30")
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid act range {part.strip()!r}: scenes are numbered from 1 and END must not be before START")
+        acts.append((start, end))
+    return acts
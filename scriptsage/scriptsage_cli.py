@@ -1,4 +1,5 @@
 import os
+import sys
 import argparse
 import requests
 from bs4 import BeautifulSoup
@@ -9,7 +10,21 @@ import pandas as pd
 import numpy as np
 import networkx as nx
 import re
+from concurrent.futures import ProcessPoolExecutor
 from helpers.social_network_analysis import plot_social_network
+from helpers.network_metrics import (
+    compute_corpus_network_metrics,
+    list_screenplay_files,
+    top_central_characters,
+)
+from helpers.similarity import load_index, save_index
+from helpers.timeline import parse_acts
+from helpers.scene_headings import encode_categories, corpus_location_stats, compact_screenplay, load_screenplay_data
+from helpers.network_export import export_network_html
+from helpers.dynamic_network import window_metrics, plot_dynamic_network
+from helpers.screenplay_model import Screenplay, load_screenplay
+from helpers.corpus_sketches import sketch_corpus
+from helpers.crawler import CatalogCrawler, DEFAULT_SEEDS, DEFAULT_FOLLOW_PATTERN, DEFAULT_SCRIPT_PATTERN
 from collections import Counter
 import nltk
 from nltk.corpus import stopwords
@@ -18,6 +33,9 @@ from nltk.corpus import stopwords
 home_dir = os.path.expanduser("~")
 screenplay_dir = os.path.join(home_dir, ".scriptsage", "screenplays")
 viz_dir = os.path.join(home_dir, ".scriptsage", "viz")
+index_dir = os.path.join(home_dir, ".scriptsage", "index")
+similarity_index_path = os.path.join(index_dir, "similarity.pkl")
+crawl_checkpoint_path = os.path.join(home_dir, ".scriptsage", "crawl.sqlite")
 
 # Create directories if they don't exist
 os.makedirs(screenplay_dir, exist_ok=True)
@@ -36,163 +54,230 @@ def scrape_screenplay(url):
     return title, script_content
 
 
-def parse_screenplay(script, title):
+# Headings wrapped in <b> tags only count when the tag holds a real heading;
+# any other bold line (character cues, transitions) is not a new scene
+scene_pattern = re.compile(r"^\s*(?:<b>\s*)?(INT\.|EXT\.|INTERIOR|EXTERIOR|INSIDE)")
+character_pattern = re.compile(r'\s{30,}([A-Z][A-Z\s.]+)(?:\s*\(.*\))?')
+dialogue_pattern = re.compile(r'^\s{2,}')
+
+# Alternative patterns
+alt_character_pattern = re.compile(r'^\s\t\t\t([A-Z][A-Z\s.]+)(?:\s*\(.*\))?')
+alt_dialogue_pattern = re.compile(r'^\t\t')
+
+
+def normalize_character_name(name):
+    name = name.strip()
+    name_corrections = {
+        "EDDIE": "EDDIE (NICE GUY EDDIE)",
+        "NICE GUY EDDIE": "EDDIE (NICE GUY EDDIE)",
+        "MR. WRITE": "MR. WHITE",
+        "YOUNG WOMAN": "HONEY BUNNY",
+        "YOUNG MAN": "PUMPKIN"
+        # Add any other corrections here
+    }
+    return name_corrections.get(name, name)
+
+
+def is_valid_character(name):
+    invalid_names = [
+        'CUT TO', 'FADE IN', 'FADE OUT', 'DISSOLVE TO', 'JEAN LUC GODDARD',
+        'TITLE SEQUENCE', 'END CREDITS', 'THE END', 'SUPERIMPOSE', 'SUPER',
+        'ANGLE ON', 'CLOSE ON', 'CLOSEUP', 'CLOSE UP', 'CONTINUED', 'CAMERA',
+        'FADE TO BLACK', 'BACK TO SCENE', 'MONTAGE', 'FLASHBACK', 'INTERCUT',
+        'TIME CUT', 'SMASH CUT', 'MATCH CUT', 'JUMP CUT', 'FREEZE FRAME',
+        'SLOW MOTION', 'FAST MOTION', 'SPLIT SCREEN', 'STOCK SHOT', 'ANGLE',
+        'POV', 'POINT OF VIEW', 'PAN', 'ZOOM', 'TRACKING SHOT', 'DOLLY',
+        'CRANE SHOT', 'AERIAL SHOT', 'ESTABLISHING SHOT', 'WIDE SHOT',
+        'MEDIUM SHOT', 'LONG SHOT', 'TWO SHOT', 'OVER THE SHOULDER', 'MR. PINK                      MR. WHITE', 'R E S E R V O I R   D O G S', 'RESERVOIR DOGS',
+        'MR. WHITE   MR. PINK   EDDIE', 'LAWRENCE TIERNEY', 'JEAN PIERRE MELVILLE',
+        'CHOW YUEN FAT', 'ROGER CORMAN', 'TIMOTHY CAREY', 'ANDRE D', 'LIONEL WHITE',
+        'BACK TO', 'POLICE FORCE', 'FADE TO', 'FADE TO WHITE', 'OF NAVARONE'
+    ]
+    return name and len(name) > 1 and name not in invalid_names
+
+
+def count_scene_dialogue(scene, character, line):
+    # Per-scene counts back the timeline prefix sums
+    if scene is None:
+        return
+    scene["dialogue_lines"][character] = scene["dialogue_lines"].get(character, 0) + 1
+    scene["dialogue_words"][character] = scene["dialogue_words"].get(character, 0) + len(line.split())
+
+
+def parse_screenplay_chunk(lines, scene_offset=0, alternative=False):
+    # Parses a run of lines that starts at a scene heading (or the whole
+    # script). Scene numbers continue from scene_offset. Characters in a
+    # scene are kept in order of appearance (a dict used as an ordered set)
+    # so that results do not depend on the process's string hash seed.
     scenes = []
     characters = {}
     current_scene = None
-    current_characters = set()
+    current_characters = {}
     dialogue_interactions = {}
     current_character = None
     global_characters = []
     global_dialogues = []
 
-    lines = script.split("\n")
-    scene_pattern = re.compile(r"^\s*(INT\.|EXT\.|INTERIOR|EXTERIOR|INSIDE|\<b\>([A-Z]))")
-    character_pattern = re.compile(r'\s{30,}([A-Z][A-Z\s.]+)(?:\s*\(.*\))?')
-    dialogue_pattern = re.compile(r'^\s{2,}')
-    
-    # Alternative patterns
-    alt_character_pattern = re.compile(r'^\s\t\t\t([A-Z][A-Z\s.]+)(?:\s*\(.*\))?')
-    alt_dialogue_pattern = re.compile(r'^\t\t')
-
-    def normalize_character_name(name):
-        name = name.strip()
-        name_corrections = {
-            "EDDIE": "EDDIE (NICE GUY EDDIE)",
-            "NICE GUY EDDIE": "EDDIE (NICE GUY EDDIE)",
-            "MR. WRITE": "MR. WHITE",
-            "YOUNG WOMAN": "HONEY BUNNY",
-            "YOUNG MAN": "PUMPKIN"
-            # Add any other corrections here
-        }
-        return name_corrections.get(name, name)
-
-    def is_valid_character(name):
-        invalid_names = [
-            'CUT TO', 'FADE IN', 'FADE OUT', 'DISSOLVE TO', 'JEAN LUC GODDARD',
-            'TITLE SEQUENCE', 'END CREDITS', 'THE END', 'SUPERIMPOSE', 'SUPER',
-            'ANGLE ON', 'CLOSE ON', 'CLOSEUP', 'CLOSE UP', 'CONTINUED', 'CAMERA',
-            'FADE TO BLACK', 'BACK TO SCENE', 'MONTAGE', 'FLASHBACK', 'INTERCUT',
-            'TIME CUT', 'SMASH CUT', 'MATCH CUT', 'JUMP CUT', 'FREEZE FRAME',
-            'SLOW MOTION', 'FAST MOTION', 'SPLIT SCREEN', 'STOCK SHOT', 'ANGLE',
-            'POV', 'POINT OF VIEW', 'PAN', 'ZOOM', 'TRACKING SHOT', 'DOLLY',
-            'CRANE SHOT', 'AERIAL SHOT', 'ESTABLISHING SHOT', 'WIDE SHOT',
-            'MEDIUM SHOT', 'LONG SHOT', 'TWO SHOT', 'OVER THE SHOULDER', 'MR. PINK                      MR. WHITE', 'R E S E R V O I R   D O G S', 'RESERVOIR DOGS',
-            'MR. WHITE   MR. PINK   EDDIE', 'LAWRENCE TIERNEY', 'JEAN PIERRE MELVILLE',
-            'CHOW YUEN FAT', 'ROGER CORMAN', 'TIMOTHY CAREY', 'ANDRE D', 'LIONEL WHITE',
-            'BACK TO', 'POLICE FORCE', 'FADE TO', 'FADE TO WHITE', 'OF NAVARONE'
-        ]
-        return name and len(name) > 1 and name not in invalid_names
-
-    # Skip lines until the first scene direction
-    start_index = 0
-    for i, line in enumerate(lines):
-        if scene_pattern.match(line):
-            start_index = i
-            break
-
-    # Process lines starting from the first scene direction
-    for line in lines[start_index:]:
+    for line in lines:
         # Identify new scenes
         if scene_pattern.match(line):
             if current_scene:
-                current_scene["characters"] = list(set(map(normalize_character_name, current_characters)))
+                current_scene["characters"] = list(dict.fromkeys(map(normalize_character_name, current_characters)))
                 scenes.append(current_scene)
             current_scene = {
-                "scene_number": len(scenes) + 1,
+                "scene_number": scene_offset + len(scenes) + 1,
                 "location": line.strip(),
                 "characters": [],
+                "dialogue_lines": {},
+                "dialogue_words": {},
             }
-            current_characters = set()
+            current_characters = {}
             current_character = None
+            continue
+
         # Identify characters and their dialogues
+        if alternative:
+            character_match = alt_character_pattern.match(line)
+            character_matches = [character_match.group(1)] if character_match else []
+            is_dialogue = alt_dialogue_pattern.match(line)
         else:
             character_matches = character_pattern.findall(line)
-            if character_matches:
-                for match in character_matches:
-                    current_character = normalize_character_name(match)
-                    if is_valid_character(current_character):
-                        if current_character not in characters:
-                            characters[current_character] = {
-                                "name": current_character,
-                                "dialogue_lines": 0,
-                                "scenes": [],
-                            }
-                        characters[current_character]["scenes"].append(len(scenes) + 1)
-                        current_characters.add(current_character)
-                        if current_character not in global_characters:
-                            global_characters.append(current_character)
-            
-            elif dialogue_pattern.match(line) and current_character:
+            is_dialogue = dialogue_pattern.match(line)
+
+        if character_matches:
+            for match in character_matches:
+                current_character = normalize_character_name(match)
                 if is_valid_character(current_character):
-                    characters[current_character]["dialogue_lines"] += 1
-                    global_dialogues.append(line.strip())
-                    for other_character in current_characters:
-                        if other_character != current_character:
-                            if current_character not in dialogue_interactions:
-                                dialogue_interactions[current_character] = {}
-                            if other_character not in dialogue_interactions[current_character]:
-                                dialogue_interactions[current_character][other_character] = 0
-                            dialogue_interactions[current_character][other_character] += 1
+                    if current_character not in characters:
+                        characters[current_character] = {
+                            "name": current_character,
+                            "dialogue_lines": 0,
+                            "scenes": [],
+                        }
+                    characters[current_character]["scenes"].append(scene_offset + len(scenes) + 1)
+                    current_characters[current_character] = None
+                    if current_character not in global_characters:
+                        global_characters.append(current_character)
+
+        elif is_dialogue and current_character:
+            if is_valid_character(current_character):
+                characters[current_character]["dialogue_lines"] += 1
+                global_dialogues.append(line.strip())
+                count_scene_dialogue(current_scene, current_character, line)
+                for other_character in current_characters:
+                    if other_character != current_character:
+                        if current_character not in dialogue_interactions:
+                            dialogue_interactions[current_character] = {}
+                        if other_character not in dialogue_interactions[current_character]:
+                            dialogue_interactions[current_character][other_character] = 0
+                        dialogue_interactions[current_character][other_character] += 1
 
     if current_scene:
-        current_scene["characters"] = list(set(map(normalize_character_name, current_characters)))
+        current_scene["characters"] = list(dict.fromkeys(map(normalize_character_name, current_characters)))
         scenes.append(current_scene)
 
-    # If no characters found, try alternative patterns
-    if len(characters) == 0:
-        current_scene = None
-        current_characters = set()
-        current_character = None
-        global_characters = []
-        global_dialogues = []
-
-        for line in lines[start_index:]:
-            if scene_pattern.match(line):
-                if current_scene:
-                    current_scene["characters"] = list(set(map(normalize_character_name, current_characters)))
-                    scenes.append(current_scene)
-                current_scene = {
-                    "scene_number": len(scenes) + 1,
-                    "location": line.strip(),
-                    "characters": [],
-                }
-                current_characters = set()
-                current_character = None
+    return {
+        "characters": characters,
+        "scenes": scenes,
+        "dialogue_interactions": dialogue_interactions,
+        "global_characters": global_characters,
+        "global_dialogues": global_dialogues,
+    }
+
+
+def merge_screenplay_chunks(chunks):
+    # Chunks are contiguous and in script order, so first-seen order of
+    # characters and interactions matches a single sequential pass
+    merged = {
+        "characters": {},
+        "scenes": [],
+        "dialogue_interactions": {},
+        "global_characters": [],
+        "global_dialogues": [],
+    }
+    seen_global_characters = set()
+    for chunk in chunks:
+        for name, char in chunk["characters"].items():
+            if name not in merged["characters"]:
+                merged["characters"][name] = char
             else:
-                character_match = alt_character_pattern.match(line)
-                if character_match:
-                    current_character = normalize_character_name(character_match.group(1))
-                    if is_valid_character(current_character):
-                        if current_character not in characters:
-                            characters[current_character] = {
-                                "name": current_character,
-                                "dialogue_lines": 0,
-                                "scenes": [],
-                            }
-                        characters[current_character]["scenes"].append(len(scenes) + 1)
-                        current_characters.add(current_character)
-                        if current_character not in global_characters:
-                            global_characters.append(current_character)
-                
-                elif alt_dialogue_pattern.match(line) and current_character:
-                    if is_valid_character(current_character):
-                        characters[current_character]["dialogue_lines"] += 1
-                        global_dialogues.append(line.strip())
-                        for other_character in current_characters:
-                            if other_character != current_character:
-                                if current_character not in dialogue_interactions:
-                                    dialogue_interactions[current_character] = {}
-                                if other_character not in dialogue_interactions[current_character]:
-                                    dialogue_interactions[current_character][other_character] = 0
-                                dialogue_interactions[current_character][other_character] += 1
-
-        if current_scene:
-            current_scene["characters"] = list(set(map(normalize_character_name, current_characters)))
-            scenes.append(current_scene)
+                merged["characters"][name]["dialogue_lines"] += char["dialogue_lines"]
+                merged["characters"][name]["scenes"].extend(char["scenes"])
+        merged["scenes"].extend(chunk["scenes"])
+        for name, interactions in chunk["dialogue_interactions"].items():
+            merged_interactions = merged["dialogue_interactions"].setdefault(name, {})
+            for other, count in interactions.items():
+                merged_interactions[other] = merged_interactions.get(other, 0) + count
+        for name in chunk["global_characters"]:
+            if name not in seen_global_characters:
+                seen_global_characters.add(name)
+                merged["global_characters"].append(name)
+        merged["global_dialogues"].extend(chunk["global_dialogues"])
+    return merged
+
+
+def split_screenplay_lines(lines, chunk_count):
+    # Cut only at scene headings, aiming for chunks of similar line counts.
+    # Returns (lines, scene_offset) pairs.
+    headings = [i for i, line in enumerate(lines) if scene_pattern.match(line)]
+    if chunk_count <= 1 or len(headings) < 2 or headings[0] != 0:
+        return [(lines, 0)]
+
+    target = len(lines) / chunk_count
+    boundaries = [(0, 0)]
+    for scene_index, line_index in enumerate(headings):
+        if line_index - boundaries[-1][0] >= target and len(boundaries) < chunk_count:
+            boundaries.append((line_index, scene_index))
+    ends = [line_index for line_index, _ in boundaries[1:]] + [len(lines)]
+    return [
+        (lines[line_index:end], scene_offset)
+        for (line_index, scene_offset), end in zip(boundaries, ends)
+    ]
+
+
+def parse_screenplay_chunks(chunks, alternative=False, workers=None):
+    if workers and workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                parse_screenplay_chunk,
+                [chunk_lines for chunk_lines, _ in chunks],
+                [scene_offset for _, scene_offset in chunks],
+                [alternative] * len(chunks),
+            ))
+    return [parse_screenplay_chunk(chunk_lines, scene_offset, alternative) for chunk_lines, scene_offset in chunks]
+
+
+def parse_screenplay(script, title, workers=None):
+    lines = script.split("\n")
+
+    # Skip lines until the first scene direction
+    start_index = 0
+    for i, line in enumerate(lines):
+        if scene_pattern.match(line):
+            start_index = i
+            break
+
+    # Process lines starting from the first scene direction, split into
+    # per-worker chunks at scene headings when workers is set
+    chunks = split_screenplay_lines(lines[start_index:], workers or 1)
+    result = merge_screenplay_chunks(parse_screenplay_chunks(chunks, workers=workers))
+
+    # If no characters found, try alternative patterns; scenes from the
+    # first pass are kept and numbering continues after them
+    if len(result["characters"]) == 0:
+        scene_offset = len(result["scenes"])
+        alt_chunks = [(chunk_lines, scene_offset + chunk_offset) for chunk_lines, chunk_offset in chunks]
+        result = merge_screenplay_chunks(
+            [result] + parse_screenplay_chunks(alt_chunks, alternative=True, workers=workers)
+        )
+
+    characters = result["characters"]
+    scenes = result["scenes"]
+    dialogue_interactions = result["dialogue_interactions"]
+    global_dialogues = result["global_dialogues"]
 
     # Normalize global_characters
-    global_characters = [normalize_character_name(char) for char in global_characters]
+    global_characters = [normalize_character_name(char) for char in result["global_characters"]]
 
     # Combine dialogues for EDDIE and NICE GUY EDDIE
     combined_dialogues = []
@@ -219,6 +304,7 @@ def parse_screenplay(script, title):
             "dialogue_interactions": dialogue_interactions,
             "global_characters": global_characters,
             "global_dialogues": combined_dialogues,
+            **encode_categories(characters.values(), scenes),
         }
     }
 
@@ -228,31 +314,16 @@ def save_json(data, filename):
         json.dump(data, f, indent=2)
 
 
-def plot_dialogue_distribution(screenplay_data, output_path):
-    characters = screenplay_data["screenplay"]["characters"]
-    
-    # Ensure characters is a list of dictionaries
-    if not isinstance(characters, list):
-        print("Error: characters data is not in the expected format")
-        return
-
-    character_names = []
-    dialogue_lines = []
-
-    for char in characters:
-        if isinstance(char, dict) and "name" in char and "dialogue_lines" in char:
-            character_names.append(char["name"])
-            dialogue_lines.append(char["dialogue_lines"])
-        else:
-            print(f"Skipping invalid character data: {char}")
-
-    if not character_names or not dialogue_lines:
+def plot_dialogue_distribution(screenplay, output_path):
+    # Character data was validated when the Screenplay model was built
+    if not screenplay.characters:
         print("No valid character data found for dialogue distribution")
         return
 
     # Sort characters by dialogue lines in descending order
-    sorted_chars = sorted(zip(character_names, dialogue_lines), key=lambda x: x[1], reverse=True)
-    character_names, dialogue_lines = zip(*sorted_chars)
+    sorted_chars = sorted(screenplay.characters, key=lambda char: char.dialogue_lines, reverse=True)
+    character_names = [char.name for char in sorted_chars]
+    dialogue_lines = [char.dialogue_lines for char in sorted_chars]
 
     plt.figure(figsize=(14, 8))
     plt.barh(character_names, dialogue_lines, color="skyblue")
@@ -265,21 +336,35 @@ def plot_dialogue_distribution(screenplay_data, output_path):
     plt.close()
 
 
-def plot_character_interaction(data, output_path):
-    G = nx.Graph()
+def plot_dialogue_timeline(screenplay, output_path, top_characters=8):
+    timeline = screenplay.timeline
+    if len(timeline) == 0 or timeline.lines.sum() == 0:
+        print("No per-scene dialogue found. Skipping dialogue timeline.")
+        return
 
-    for char in data["screenplay"]["characters"]:
-        G.add_node(char["name"], size=char["dialogue_lines"])
+    totals = timeline.totals()
+    ranked = np.argsort(totals)[::-1][:top_characters]
+    ranked = [i for i in ranked if totals[i] > 0]
+    series = [timeline.lines[:, i] for i in ranked]
+    labels = [timeline.character_names[i] for i in ranked]
+    other = timeline.lines.sum(axis=1) - np.sum(series, axis=0)
+    if other.any():
+        series.append(other)
+        labels.append("OTHER")
+
+    plt.figure(figsize=(14, 8))
+    plt.stackplot(timeline.scene_numbers, series, labels=labels)
+    plt.xlabel("Scene")
+    plt.ylabel("Number of Dialogue Lines")
+    plt.title("Dialogue Timeline")
+    plt.legend(loc="upper left", bbox_to_anchor=(1, 1))
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
 
-    for scene in data["screenplay"]["scenes"]:
-        for i in range(len(scene["characters"])):
-            for j in range(i + 1, len(scene["characters"])):
-                char1 = scene["characters"][i]
-                char2 = scene["characters"][j]
-                if G.has_edge(char1, char2):
-                    G[char1][char2]["weight"] += 1
-                else:
-                    G.add_edge(char1, char2, weight=1)
+
+def plot_character_interaction(screenplay, output_path):
+    G = screenplay.graph
 
     pos = nx.spring_layout(G)
     sizes = [nx.get_node_attributes(G, "size")[node] * 10 for node in G.nodes()]
@@ -301,12 +386,11 @@ def plot_character_interaction(data, output_path):
     plt.close()
 
 
-def plot_heatmap(data, output_path):
-    characters = data["screenplay"]["characters"]
-    dialogue_interactions = data["screenplay"]["dialogue_interactions"]
+def plot_heatmap(screenplay, output_path):
+    dialogue_interactions = screenplay.dialogue_interactions or {}
 
     # Create a list of character names
-    character_names = [char["name"] for char in characters]
+    character_names = [char.name for char in screenplay.characters]
 
     # Create a DataFrame for the interaction matrix
     interaction_matrix = pd.DataFrame(0, index=character_names, columns=character_names)
@@ -337,19 +421,12 @@ def plot_heatmap(data, output_path):
     plt.close()
 
 
-def get_metrics(screenplay_data):
-    script_content = screenplay_data['screenplay']['script_content']
-    words = script_content.lower().split()
-    word_count = len(words)
-    scene_count = len(screenplay_data['screenplay']['scenes'])
-    character_count = len(screenplay_data['screenplay']['characters'])
-    character_names = [char['name'].lower() for char in screenplay_data['screenplay']['characters']]
-
+def get_stop_words():
     # Download stopwords if not already downloaded
     nltk.download('stopwords', quiet=True)
     stop_words = set(stopwords.words('english'))
 
-    # Add additional stopwords, character names, and invalid names
+    # Add additional stopwords and invalid names
     additional_stopwords = {
         'i\'m', 'got', 'he\'s', 'get', 'gonna', 'are', 'it\'s', 'don\'t', 'that\'s', 'you\'re', 
         'ain\'t', 'can\'t', 'won\'t', 'gotta', 'wanna', 'it.', '-', '--', '...', ':', ';', ',', '.',
@@ -362,10 +439,24 @@ def get_metrics(screenplay_data):
         'split', 'screen', 'stock', 'shot', 'pov', 'point', 'view', 'pan', 'zoom', 'tracking',
         'dolly', 'crane', 'aerial', 'establishing', 'wide', 'medium', 'long', 'two', 'shoulder'
     }
-    stop_words.update(additional_stopwords, character_names, invalid_names)
+    stop_words.update(additional_stopwords, invalid_names)
+    return stop_words
+
+
+def get_metrics(screenplay):
+    script_content = screenplay.script_content or ""
+    word_counts = screenplay.word_counts
+    word_count = sum(word_counts.values())
+    scene_count = len(screenplay.scenes)
+    character_count = len(screenplay.characters)
+    character_names = [char.name.lower() for char in screenplay.characters]
+
+    # Stopwords plus character names
+    stop_words = get_stop_words()
+    stop_words.update(character_names)
 
     # Top 50 most used words (excluding stopwords, non-word characters, and character names)
-    word_freq = Counter(word for word in words if word not in stop_words and word.isalnum())
+    word_freq = Counter({word: count for word, count in word_counts.items() if word not in stop_words and word.isalnum()})
     top_50_words = word_freq.most_common(50)
 
     # Top 5 longest words
@@ -373,8 +464,9 @@ def get_metrics(screenplay_data):
     longest_words = sorted(set(all_words), key=len, reverse=True)[:5]
 
     # Update character_words using global_characters and global_dialogues
-    character_words = {char: [] for char in screenplay_data['screenplay']['global_characters']}
-    for char, dialogue in zip(screenplay_data['screenplay']['global_characters'], screenplay_data['screenplay']['global_dialogues']):
+    global_characters = screenplay.global_characters or []
+    character_words = {char: [] for char in global_characters}
+    for char, dialogue in zip(global_characters, screenplay.global_dialogues or []):
         words = dialogue.lower().split()
         # Remove the character names from the dialogue
         words = [word for word in words if word not in [name.lower().replace('.', '') for name in character_names]]
@@ -390,7 +482,7 @@ def get_metrics(screenplay_data):
         'word_count': word_count,
         'scene_count': scene_count,
         'character_count': character_count,
-        'character_names': [char['name'] for char in screenplay_data['screenplay']['characters']],
+        'character_names': [char.name for char in screenplay.characters],
         'top_50_words': top_50_words,
         'top_character_words': top_character_words,
         'longest_words': longest_words
@@ -409,45 +501,309 @@ def print_metrics(metrics):
         print(f"{char}: {', '.join(f'{word}({count})' for word, count in words)}")
     print("\nTop 5 longest words:")
     print(', '.join(metrics['longest_words']))
+    if 'central_characters' in metrics:
+        print("\nTop 5 central characters (PageRank):")
+        print(', '.join(metrics['central_characters']))
+
+def network_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py network",
+        description="Compute network metrics for saved screenplays",
+    )
+    parser.add_argument("paths", nargs="*", help="Screenplay JSON files (default: all saved screenplays)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--samples", type=int, default=None, help="Source samples for approximate betweenness")
+    parser.add_argument("--max-iter", type=int, default=100, help="Maximum power iterations")
+    parser.add_argument("--tol", type=float, default=1e-6, help="Convergence tolerance")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or list_screenplay_files(screenplay_dir)
+    results = compute_corpus_network_metrics(
+        paths,
+        workers=args.workers,
+        max_iter=args.max_iter,
+        tol=args.tol,
+        betweenness_samples=args.samples,
+    )
+    for path, error in results:
+        if error:
+            print(f"Failed to compute network metrics for {path}: {error}")
+        else:
+            print(f"Network metrics saved to: {path}")
+
+def load_similarity_index():
+    # Screenplays saved since the last query are indexed here, so scraping
+    # and crawling never touch the index
+    index = load_index(similarity_index_path)
+    if index.update_from_directory(screenplay_dir):
+        save_index(index, similarity_index_path)
+    return index
+
+def similar_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py similar",
+        description="Find saved screenplays similar to the given title",
+    )
+    parser.add_argument("title", type=str, help="Title (or saved file name) of the screenplay")
+    parser.add_argument("--top", type=int, default=10, help="Number of results to show")
+    args = parser.parse_args(argv)
+
+    index = load_similarity_index()
+    doc_id = index.find(args.title)
+    if doc_id is None:
+        print(f"No saved screenplay matches: {args.title}")
+        return
 
-def main():
-    parser = argparse.ArgumentParser(description="ScriptSage CLI")
-    parser.add_argument("url", type=str, help="URL of the screenplay to scrape")
-    parser.add_argument("--metrics", action="store_true", help="Print screenplay metrics")
-    args = parser.parse_args()
-
-    title, script_content = scrape_screenplay(args.url)
-    screenplay_data = parse_screenplay(script_content, title)
-    screenplay_data['screenplay']['script_content'] = script_content  # Add full script content to the data
+    results = index.similar(doc_id, top=args.top)
+    if not results:
+        print(f"No similar screenplays found for: {index.documents[doc_id]['title']}")
+        return
+    print(f"Screenplays similar to {index.documents[doc_id]['title']}:")
+    for result in results:
+        print(f"{result['title']} ({result['doc_id']}): cosine {result['cosine']:.3f}, jaccard ~{result['jaccard']:.3f}")
+
+def dedupe_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py dedupe",
+        description="Report near-duplicate saved screenplays",
+    )
+    parser.add_argument("--threshold", type=float, default=0.5, help="Minimum estimated Jaccard similarity")
+    parser.add_argument("--output", type=str, default=None, help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    index = load_similarity_index()
+    report = index.duplicate_report(threshold=args.threshold)
+    if args.output:
+        save_json(report, args.output)
+        print(f"Duplicate report saved to: {args.output}")
+
+    print(f"Near-duplicate groups: {len(report['groups'])}")
+    for group in report['groups']:
+        print(', '.join(group))
+    for pair in report['pairs']:
+        print(f"{pair['documents'][0]} <-> {pair['documents'][1]}: jaccard ~{pair['jaccard']:.3f}, cosine {pair['cosine']:.3f}")
+
+def timeline_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py timeline",
+        description="Break down dialogue share by scene ranges",
+    )
+    parser.add_argument("path", type=str, help="Saved screenplay JSON file")
+    parser.add_argument("--acts", type=str, default=None, help='Scene ranges such as "1-30,31-80,81-120"')
+    parser.add_argument("--measure", choices=["lines", "words"], default="lines", help="Count dialogue lines or words")
+    parser.add_argument("--top", type=int, default=5, help="Characters to show per range")
+    args = parser.parse_args(argv)
+
+    try:
+        acts = parse_acts(args.acts) if args.acts else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    timeline = load_screenplay(args.path).timeline
+    acts = acts or [(1, len(timeline))]
+
+    for act in timeline.act_breakdown(acts, measure=args.measure):
+        shares = act["shares"]
+        if not any(shares.values()):
+            print(f"Scenes {act['start']}-{act['end']}: no dialogue")
+            continue
+        top = sorted(shares, key=shares.get, reverse=True)[:args.top]
+        print(f"Scenes {act['start']}-{act['end']}: " + ', '.join(f"{name} {shares[name]:.1%}" for name in top))
+
+def locations_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py locations",
+        description="Summarize scenes and dialogue per location across saved screenplays",
+    )
+    parser.add_argument("paths", nargs="*", help="Screenplay JSON files (default: all saved screenplays)")
+    parser.add_argument("--top", type=int, default=20, help="Number of locations to show")
+    args = parser.parse_args(argv)
+
+    stats = corpus_location_stats(args.paths or list_screenplay_files(screenplay_dir))
+    ranked = sorted(stats, key=lambda location: stats[location]["dialogue_lines"], reverse=True)
+    for location in ranked[:args.top]:
+        row = stats[location]
+        print(f"{location}: {row['dialogue_lines']} lines, {row['scenes']} scenes, {row['screenplays']} screenplays")
+
+def crawl_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py crawl",
+        description="Crawl a script catalog and process every script found (resumable)",
+    )
+    parser.add_argument("seeds", nargs="*", default=DEFAULT_SEEDS, help="Index page URLs to start from")
+    parser.add_argument("--checkpoint", type=str, default=crawl_checkpoint_path, help="SQLite checkpoint file")
+    parser.add_argument("--follow-pattern", type=str, default=DEFAULT_FOLLOW_PATTERN, help="Regex for index page paths to follow")
+    parser.add_argument("--script-pattern", type=str, default=DEFAULT_SCRIPT_PATTERN, help="Regex for script page paths")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many scripts")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds to wait between requests")
+    args = parser.parse_args(argv)
+
+    crawler = CatalogCrawler(
+        args.checkpoint,
+        seeds=args.seeds,
+        follow_pattern=args.follow_pattern,
+        script_pattern=args.script_pattern,
+        delay=args.delay,
+    )
+    try:
+        handled = crawler.crawl(process_screenplay, limit=args.limit)
+        print(f"Processed {handled} scripts")
+        for state, count in sorted(crawler.stats().items()):
+            print(f"{state}: {count}")
+    finally:
+        crawler.close()
+
+def dynamic_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py dynamic",
+        description="Track the interaction network over a sliding window of scenes",
+    )
+    parser.add_argument("path", type=str, help="Saved screenplay JSON file")
+    parser.add_argument("--window", type=int, default=10, help="Number of scenes per window")
+    parser.add_argument("--step", type=int, default=1, help="Scenes to advance the window by")
+    parser.add_argument("--output", type=str, default=None, help="Save a small-multiples render to this PNG file")
+    args = parser.parse_args(argv)
+
+    screenplay_data = load_screenplay_data(args.path)
+
+    for row in window_metrics(screenplay_data, window=args.window, step=args.step):
+        print(f"Scenes {row['start']}-{row['end']}: density {row['density']:.2f}, central {', '.join(row['central_characters'])}")
+    if args.output:
+        plot_dynamic_network(screenplay_data, args.output, window=args.window)
+        print(f"Dynamic network saved to: {args.output}")
+
+def export_html_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py export-html",
+        description="Export a pre-laid-out interactive network page",
+    )
+    parser.add_argument("path", type=str, help="Saved screenplay JSON file")
+    parser.add_argument("--output", type=str, default=None, help="HTML file to write (default: next to the visualizations)")
+    parser.add_argument("--min-weight", type=int, default=1, help="Drop edges with fewer shared scenes")
+    parser.add_argument("--max-edges", type=int, default=None, help="Keep only the heaviest edges")
+    args = parser.parse_args(argv)
+
+    screenplay_data = load_screenplay_data(args.path)
+    sanitized_title = re.sub(r"\W+", "_", screenplay_data['screenplay']['title'])
+    output_path = args.output or os.path.join(viz_dir, f"{sanitized_title}_social_network.html")
+    export_network_html(screenplay_data, output_path, min_weight=args.min_weight, max_edges=args.max_edges)
+    print(f"Network page saved to: {output_path}")
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def corpus_metrics_command(argv):
+    parser = argparse.ArgumentParser(
+        prog="scriptsage_cli.py corpus-metrics",
+        description="Corpus-wide word statistics in bounded memory",
+    )
+    parser.add_argument("paths", nargs="*", help="Screenplay JSON files (default: all saved screenplays)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--top", type=int, default=50, help="Number of top words to show")
+    parser.add_argument("--capacity", type=positive_int, default=1000, help="Counters kept for corpus top words")
+    parser.add_argument("--character-capacity", type=positive_int, default=20, help="Counters kept per character")
+    parser.add_argument("--max-characters", type=positive_int, default=500, help="Characters kept with a word summary, by dialogue volume")
+    parser.add_argument("--width", type=positive_int, default=2 ** 14, help="Count-Min sketch width")
+    parser.add_argument("--depth", type=positive_int, default=4, help="Count-Min sketch depth")
+    parser.add_argument("--word", action="append", default=[], help="Estimate the count of this word (repeatable)")
+    parser.add_argument("--output", type=str, default=None, help="Write the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    sketch = sketch_corpus(
+        args.paths or list_screenplay_files(screenplay_dir),
+        stop_words=frozenset(get_stop_words()),
+        workers=args.workers,
+        capacity=args.capacity,
+        character_capacity=args.character_capacity,
+        max_characters=args.max_characters,
+        width=args.width,
+        depth=args.depth,
+    )
+    summary = sketch.summary(top=args.top)
+    if args.output:
+        save_json(summary, args.output)
+        print(f"Corpus metrics saved to: {args.output}")
+
+    bounds = summary['error_bounds']
+    print(f"Screenplays: {summary['screenplays']}")
+    print(f"Total counted words: {summary['total_words']}")
+    print(f"\nTop {args.top} words (count, lower bound):")
+    for row in summary['top_words']:
+        print(f"{row['word']}: {row['count']} (>= {row['lower_bound']})")
+    print(f"\nCounts overestimate by at most {bounds['count_min_max_overcount']} with probability {1 - bounds['count_min_delta']:.3f}")
+    for word in args.word:
+        print(f"{word}: ~{sketch.estimate(word.lower())}")
+
+commands = {
+    "network": network_command,
+    "corpus-metrics": corpus_metrics_command,
+    "export-html": export_html_command,
+    "dynamic": dynamic_command,
+    "crawl": crawl_command,
+    "locations": locations_command,
+    "timeline": timeline_command,
+    "similar": similar_command,
+    "dedupe": dedupe_command,
+}
+
+def process_screenplay(url, metrics=False, workers=None):
+    title, script_content = scrape_screenplay(url)
+    screenplay = Screenplay.from_dict(parse_screenplay(script_content, title, workers=workers), script_content=script_content)
+    screenplay.extra['network_metrics'] = screenplay.network_metrics
+    screenplay.extra['dynamic_network'] = screenplay.dynamic_network
+    screenplay_data = screenplay.to_dict()
 
     # Sanitize title for filenames
     sanitized_title = re.sub(r"\W+", "_", title)
 
     screenplay_filename = os.path.join(screenplay_dir, f"{sanitized_title}.json")
-    save_json(screenplay_data, screenplay_filename)
+    save_json(compact_screenplay(screenplay_data), screenplay_filename)
 
     print(f"Screenplay data saved to: {screenplay_filename}")
 
-    # Generate visualizations
+    # Generate visualizations. The plots defined here read the Screenplay
+    # model; the network helpers are shared with export-html and dynamic,
+    # which work from saved JSON, so they get the saved data
     visualizations = [
-        (plot_dialogue_distribution, "dialogue_distribution"),
-        (plot_character_interaction, "character_interaction"),
-        (plot_heatmap, "character_interaction_heatmap"),
-        (plot_social_network, "social_network")
+        (plot_dialogue_distribution, screenplay, "dialogue_distribution"),
+        (plot_dialogue_timeline, screenplay, "dialogue_timeline"),
+        (plot_character_interaction, screenplay, "character_interaction"),
+        (plot_heatmap, screenplay, "character_interaction_heatmap"),
+        (plot_social_network, screenplay_data, "social_network"),
+        (plot_dynamic_network, screenplay_data, "dynamic_network"),
     ]
 
-    for plot_func, viz_name in visualizations:
+    for plot_func, source, viz_name in visualizations:
         try:
             plot_func(
-                screenplay_data,
+                source,
                 os.path.join(viz_dir, f"{sanitized_title}_{viz_name}.png"),
             )
         except Exception as e:
             print(f"Failed to generate {viz_name}: {str(e)}")
 
-    if args.metrics:
-        metrics = get_metrics(screenplay_data)
-        print_metrics(metrics)
+    if metrics:
+        screenplay_metrics = get_metrics(screenplay)
+        screenplay_metrics['central_characters'] = top_central_characters(screenplay.network_metrics)
+        print_metrics(screenplay_metrics)
+
+    return screenplay_filename
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in commands:
+        return commands[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(description="ScriptSage CLI")
+    parser.add_argument("url", type=str, help="URL of the screenplay to scrape")
+    parser.add_argument("--metrics", action="store_true", help="Print screenplay metrics")
+    parser.add_argument("--workers", type=int, default=None, help="Parse very large scripts in parallel, split at scene headings")
+    args = parser.parse_args(argv)
+
+    process_screenplay(args.url, metrics=args.metrics, workers=args.workers)
 
 if __name__ == "__main__":
     main()